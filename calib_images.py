@@ -0,0 +1,16 @@
+# calib_images.py
+"""
+INT8 量化校准图片的收集，int8_engine.py（TensorRT）与 int8_onnx.py（ONNX Runtime）共用。
+单独成模块，导入时不依赖 tensorrt / onnxruntime。
+"""
+import random
+from pathlib import Path
+
+IMG_EXTS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+
+def collect_images(image_dir, num, seed=0):
+    """递归收集校准图片，随机抽取 num 张（固定随机种子，保证每次量化使用相同的校准集）"""
+    paths = sorted(p for p in Path(image_dir).rglob("*") if p.suffix.lower() in IMG_EXTS)
+    random.Random(seed).shuffle(paths)
+    return paths[:num]
@@ -0,0 +1,112 @@
+# capture_worker.py
+import threading
+import time
+
+import cv2
+from PyQt5.QtCore import QThread
+
+
+def open_capture(source):
+    """
+    打开视频文件或摄像头。视频文件优先用 FFmpeg 后端的硬件解码（VAAPI/NVDEC/QSV 等），
+    不支持或打开失败时回退到默认的软件解码；缓冲区设为 1，始终读到最新帧。
+    """
+    cap = None
+    if isinstance(source, str) and hasattr(cv2, 'CAP_PROP_HW_ACCELERATION'):
+        try:
+            cap = cv2.VideoCapture(source, cv2.CAP_FFMPEG, [
+                cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY,
+                cv2.CAP_PROP_HW_ACCELERATION_USE_OPENCL, 1,
+            ])
+        except cv2.error:
+            cap = None
+    if cap is None or not cap.isOpened():
+        cap = cv2.VideoCapture(source)
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    return cap
+
+
+class CaptureWorker(QThread):
+    """
+    采集线程：按视频原始帧率循环读取帧，只保留最新的一帧（单槽）。
+    GUI 定时器以固定频率通过 read_latest() 拉取，读取与显示、检测互不阻塞；
+    跳帧请求通过 seek() 记录，由采集线程在下一次读取前执行。
+    """
+
+    def __init__(self, capture, fps=None, loop=True):
+        super().__init__()
+        self.capture = capture
+        self.interval = 1.0 / fps if fps else 0.0  # 摄像头等实时源不需要限速
+        self.loop = loop
+        self._lock = threading.Lock()
+        self._latest = None  # (frame, pos)
+        self._seek_to = None
+        self._paused = threading.Event()
+        self._running = True
+
+    def read_latest(self):
+        """取走最新一帧，返回 (frame, pos)；自上次调用后没有新帧时返回 None"""
+        with self._lock:
+            latest, self._latest = self._latest, None
+        return latest
+
+    def seek(self, frame_no):
+        with self._lock:
+            self._seek_to = frame_no
+            self._latest = None
+
+    def pause(self):
+        self._paused.set()
+
+    def resume(self):
+        self._paused.clear()
+
+    def run(self):
+        next_t = time.perf_counter()
+        skip = 0  # 落后的整帧数
+        while self._running:
+            if self._paused.is_set():
+                time.sleep(0.01)
+                next_t = time.perf_counter()
+                continue
+
+            with self._lock:
+                seek_to, self._seek_to = self._seek_to, None
+            if seek_to is not None:
+                self.capture.set(cv2.CAP_PROP_POS_FRAMES, seek_to)
+                skip = 0
+
+            # 读取慢于视频帧率时，用 grab() 跳过落后的帧（只解码，不做格式转换和拷贝），保持实时进度
+            for _ in range(skip):
+                if not self.capture.grab():
+                    break
+            skip = 0
+
+            ret, frame = self.capture.read()
+            if not ret:
+                if not self.loop:
+                    break
+                # 播放到末尾后，循环从头开始
+                self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                ret, frame = self.capture.read()
+                if not ret:
+                    print("无法重新读取第一帧")
+                    break
+
+            pos = int(self.capture.get(cv2.CAP_PROP_POS_FRAMES))
+            with self._lock:
+                self._latest = (frame, pos)
+
+            # 按视频帧率限速；落后时记下需要跳过的帧数，并以当前时间为新的基准
+            if self.interval:
+                next_t += self.interval
+                delay = next_t - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    skip = int(-delay / self.interval)
+                    next_t = time.perf_counter()
+
+    def stop(self):
+        self._running = False
+        self._paused.clear()
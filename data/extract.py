@@ -1,11 +1,61 @@
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 
 # 固定路径配置（请根据实际情况修改）
 SOURCE_DIR = r"./tsrd_dataset/images/val"
 TARGET_DIR = r"./tsrd_dataset/labels/train/"
 OUTPUT_DIR = r"./tsrd_dataset/labels/test/"
 
+# 回退路径使用的读写缓冲区大小
+COPY_BUFSIZE = 1024 * 1024
+
+
+def _kernel_copy(src_fd, dst_fd, count):
+    """在内核态复制 count 字节，返回未复制的剩余字节数；两种系统调用都不可用时原样返回 count"""
+    copy_funcs = []
+    if hasattr(os, 'copy_file_range'):
+        copy_funcs.append(lambda n: os.copy_file_range(src_fd, dst_fd, n))
+    if hasattr(os, 'sendfile'):
+        copy_funcs.append(lambda n: os.sendfile(dst_fd, src_fd, None, n))
+
+    for copy_func in copy_funcs:
+        try:
+            while count > 0:
+                n = copy_func(count)
+                if n == 0:
+                    break
+                count -= n
+            return count
+        except OSError:
+            # 文件系统不支持时，从当前偏移处继续尝试下一种方式
+            continue
+    return count
+
+
+def fast_copy2(src, dst):
+    """
+    复制文件内容及元数据（语义同 shutil.copy2）：
+    优先使用 os.copy_file_range / os.sendfile 在内核态完成复制，
+    都不可用时回退到 1 MiB 缓冲区的 shutil.copyfileobj。
+    """
+    st = os.stat(src)
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        if _kernel_copy(fsrc.fileno(), fdst.fileno(), st.st_size) > 0:
+            shutil.copyfileobj(fsrc, fdst, COPY_BUFSIZE)
+
+    # 单次 stat 的结果同时用于恢复时间戳与权限
+    os.utime(dst, ns=(st.st_atime_ns, st.st_mtime_ns))
+    os.chmod(dst, st.st_mode)
+
+
+def _basename(filename):
+    """去掉最后一个扩展名，结果与 os.path.splitext(filename)[0] 一致（开头的点不算扩展名分隔符）"""
+    dot = filename.rfind('.')
+    if dot <= 0 or (filename[0] == '.' and not filename[:dot].lstrip('.')):
+        return filename
+    return filename[:dot]
+
 
 def extract_matching_files_ignore_suffix(source_dir, target_dir, output_dir):
     if not os.path.isdir(source_dir):
@@ -18,20 +68,27 @@ def extract_matching_files_ignore_suffix(source_dir, target_dir, output_dir):
     os.makedirs(output_dir, exist_ok=True)
 
     # 获取源目录中所有文件主名（不含扩展名）
-    source_basenames = set(
-        os.path.splitext(f)[0] for f in os.listdir(source_dir) if os.path.isfile(os.path.join(source_dir, f)))
+    # 使用 os.scandir 复用目录项中缓存的类型信息，避免每个文件额外一次 stat
+    with os.scandir(source_dir) as it:
+        source_basenames = {_basename(entry.name) for entry in it if entry.is_file()}
 
     matched_files = []
+    copy_tasks = []
 
-    for filename in os.listdir(target_dir):
-        full_path = os.path.join(target_dir, filename)
-        if not os.path.isfile(full_path):
-            continue
-        basename, ext = os.path.splitext(filename)
-        if basename in source_basenames:
-            dst_path = os.path.join(output_dir, filename)
-            shutil.copy2(full_path, dst_path)
-            matched_files.append(filename)
+    with os.scandir(target_dir) as it:
+        for entry in it:
+            if not entry.is_file():
+                continue
+            if _basename(entry.name) in source_basenames:
+                dst_path = os.path.join(output_dir, entry.name)
+                copy_tasks.append((entry.path, dst_path))
+                matched_files.append(entry.name)
+
+    # 文件复制属于 I/O 密集型操作，用线程池并发执行，让读写相互重叠
+    if copy_tasks:
+        max_workers = min(32, (os.cpu_count() or 1) * 4)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(lambda task: fast_copy2(*task), copy_tasks))
 
     print(f"共匹配 {len(matched_files)} 个文件并复制到输出目录。")
     if matched_files:
@@ -42,5 +99,42 @@ def extract_matching_files_ignore_suffix(source_dir, target_dir, output_dir):
         print("未找到任何同名文件（忽略扩展名匹配）。")
 
 
+# 按文件名末 4 个字符（小写）判断是否为图片
+_IMG_EXTS = ('.png', '.jpg', 'jpeg', '.bmp')
+
+
+def extract_images_by_prefix(source_dir, output_dir, expected_classes=None):
+    """
+    按文件名前缀（"_" 之前的类别编号，如 000_0001.png 中的 000）为每个类别提取第一张图片。
+    以 os.scandir 流式遍历目录；给定 expected_classes 时，集齐该数量的类别后立即停止遍历。
+    """
+    if not os.path.isdir(source_dir):
+        print(f"源目录不存在: {source_dir}")
+        return
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    seen_prefixes = set()
+    log_lines = []
+    with os.scandir(source_dir) as it:
+        for entry in it:
+            name = entry.name
+            if name[-4:].lower() not in _IMG_EXTS or not entry.is_file():
+                continue
+            prefix = name.split('_', 1)[0]
+            if prefix in seen_prefixes:
+                continue
+            seen_prefixes.add(prefix)
+            fast_copy2(entry.path, os.path.join(output_dir, name))
+            log_lines.append(f"提取：{name}")
+            if expected_classes is not None and len(seen_prefixes) >= expected_classes:
+                break
+
+    # 汇总后一次性输出，避免每个文件都刷新一次 stdout
+    if log_lines:
+        print("\n".join(log_lines))
+    print(f"共提取 {len(seen_prefixes)} 个类别的图片到输出目录。")
+
+
 if __name__ == "__main__":
     extract_matching_files_ignore_suffix(SOURCE_DIR, TARGET_DIR, OUTPUT_DIR)
@@ -0,0 +1,66 @@
+# detect_worker.py
+import threading
+from collections import deque
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from detector import Detector
+
+
+class DetectWorker(QThread):
+    """
+    检测工作线程：在后台线程中运行 Detector.detect，GUI 线程只负责显示。
+    待检测帧只保留最新的一帧（单槽），检测跟不上时直接丢弃旧帧，界面不会越积越慢。
+    batch_size > 1 时保留最新的 batch_size 帧，每次把已积攒的帧合成一个批次推理。
+    draw=False 时不在帧上绘制，改为发射 detections_ready，由界面在显示尺寸上绘制检测框。
+    """
+    frame_ready = pyqtSignal(object, str)  # 发射 (带框的 BGR ndarray, 文本描述)
+    # 发射 (原始 BGR ndarray, 检测框, 标签文本列表, 文本描述)
+    detections_ready = pyqtSignal(object, object, object, str)
+
+    def __init__(self, detector=None, batch_size=1, draw=True):
+        super().__init__()
+        self.detector = detector if detector is not None else Detector()
+        self.batch_size = max(1, batch_size)
+        self.draw = draw
+        self._pending = deque(maxlen=self.batch_size)
+        self._cond = threading.Condition()
+        self._running = True
+
+    def submit(self, frame):
+        """提交一帧待检测图像；若上一帧尚未被取走，则被新帧覆盖"""
+        with self._cond:
+            self._pending.append(frame)
+            self._cond.notify()
+
+    def run(self):
+        while True:
+            with self._cond:
+                while self._running and not self._pending:
+                    self._cond.wait()
+                if not self._running:
+                    break
+                frames = list(self._pending)
+                self._pending.clear()
+
+            if not self.draw:
+                if len(frames) == 1:
+                    results = [self.detector.detect_boxes(frames[0])]
+                else:
+                    results = self.detector.detect_boxes_batch(frames)
+                for frame, (boxes, texts) in zip(frames, results):
+                    self.detections_ready.emit(frame, boxes, texts, self.detector.summarize(texts))
+                continue
+
+            if len(frames) == 1:
+                results = [self.detector.detect(frames[0])]
+            else:
+                results = self.detector.detect_batch(frames)
+            for frame_with_boxes, text in results:
+                self.frame_ready.emit(frame_with_boxes, text)
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._pending.clear()
+            self._cond.notify()
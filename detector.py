@@ -1,70 +1,478 @@
 # detector.py
+import importlib.util
+import os
+import sys
 import cv2
+import numpy as np
 import torch
+import torch.nn.functional as F
+import torchvision
 from pathlib import Path
 
+# 假设 yolov5_local 位于当前脚本同级目录；加入 sys.path 以复用其中的坐标转换与映射工具函数
+YOLOV5_DIR = Path(__file__).parent / "yolov5_local"
+if str(YOLOV5_DIR) not in sys.path:
+    sys.path.append(str(YOLOV5_DIR))
+
+from utils.general import check_img_size, scale_boxes, xywh2xyxy  # noqa: E402
+
+# 按速度优先选择后端：TensorRT INT8 引擎 > TensorRT FP16 引擎 > ONNX Runtime（CPU 上优先 INT8 模型）> PyTorch 权重。
+# 加速模型由 export.py 生成，INT8 引擎由 int8_engine.py 从静态输入的 best_1.onnx 校准生成；
+# CPU 用的 INT8 ONNX 模型由 int8_onnx.py 自行导出动态输入的 ONNX（不覆盖 best_1.onnx）后校准生成：
+#   python yolov5_local/export.py --weights yolov5_local/best_1.pt --include engine --half --imgsz 640 --device 0
+#   python yolov5_local/export.py --weights yolov5_local/best_1.pt --include onnx --imgsz 640
+#   python int8_engine.py
+#   python int8_onnx.py
+PT_WEIGHTS = YOLOV5_DIR / "best_1.pt"
+INT8_ENGINE_WEIGHTS = YOLOV5_DIR / "best_1_int8.engine"
+ENGINE_WEIGHTS = YOLOV5_DIR / "best_1.engine"
+ONNX_WEIGHTS = YOLOV5_DIR / "best_1.onnx"
+INT8_ONNX_WEIGHTS = YOLOV5_DIR / "best_1.int8.onnx"
+
+# 标签文字的字体参数：getTextSize 与 putText 必须一致，文字尺寸缓存才有效
+LABEL_FONT = cv2.FONT_HERSHEY_SIMPLEX
+LABEL_FONT_SCALE = 0.6
+LABEL_FONT_THICKNESS = 1
+# 文字尺寸缓存的最大条目数（类别数 x 置信度取值，正常远小于该值）
+TEXT_SIZE_CACHE_MAX = 4096
+# 相似帧判定所用灰度缩略图的边长：32x32 足以反映画面中新出现的小目标，计算量仍可忽略
+THUMB_SIZE = 32
+# letterbox 的填充灰度值，与 utils.augmentations.letterbox 的默认值一致
+LETTERBOX_PAD = 114
+
+
+def letterbox_geometry(shape, new_size, stride=32, auto=False):
+    """
+    按 utils.augmentations.letterbox 的规则计算几何参数，返回
+    (输出尺寸 (h, w), 缩放后尺寸 (h, w), 左上角填充 (top, left))，供 GPU 预处理复现同样的结果。
+    """
+    h, w = shape[:2]
+    r = min(new_size / h, new_size / w)
+    unpad_h, unpad_w = int(round(h * r)), int(round(w * r))
+    dh, dw = new_size - unpad_h, new_size - unpad_w
+    if auto:
+        dh, dw = dh % stride, dw % stride
+    top, left = int(round(dh / 2 - 0.1)), int(round(dw / 2 - 0.1))
+    return (unpad_h + dh, unpad_w + dw), (unpad_h, unpad_w), (top, left)
+
+
+class _TracedModel(torch.nn.Module):
+    """
+    按输入形状缓存 torch.jit.trace 的结果，消除逐算子的 Python 调度开销。
+    视频流的输入形状固定，通常只需追踪一次；追踪失败时回退到原始 eager 模型。
+    """
+
+    def __init__(self, model):
+        super().__init__()
+        self.eager = model
+        self._traced = {}
+
+    def forward(self, x, *args, **kwargs):
+        if args or kwargs:
+            return self.eager(x, *args, **kwargs)
+        key = tuple(x.shape)
+        traced = self._traced.get(key)
+        if traced is None:
+            try:
+                traced = torch.jit.trace(self.eager, x, strict=False, check_trace=False)
+            except Exception as e:
+                print("Detector: TorchScript 追踪失败，使用 eager 模式:", e)
+                traced = self.eager
+            self._traced[key] = traced
+        return traced(x)
+
+
+def select_weights():
+    """
+    返回当前机器上最快的可用 (权重路径, 设备)：
+    TensorRT INT8 / FP16 引擎（需要 CUDA）
+    > ONNX Runtime（有 CUDA 时用 CUDA EP，否则 CPU EP，CPU 上优先 INT8 静态量化模型）
+    > PyTorch 权重（CPU）
+    """
+    cuda = torch.cuda.is_available()
+    for engine in (INT8_ENGINE_WEIGHTS, ENGINE_WEIGHTS):
+        if engine.exists() and cuda:
+            return engine, "cuda:0"
+    if importlib.util.find_spec("onnxruntime") is not None:
+        if not cuda and INT8_ONNX_WEIGHTS.exists():
+            return INT8_ONNX_WEIGHTS, "cpu"
+        if ONNX_WEIGHTS.exists():
+            return ONNX_WEIGHTS, "cuda:0" if cuda else "cpu"
+    return PT_WEIGHTS, "cpu"
+
+
 class Detector:
-    def __init__(self):
-        # 假设 yolov5_local 位于当前脚本同级目录
-        repo_dir = str(Path(__file__).parent / "yolov5_local")
-        weights_path = str(Path(__file__).parent / "yolov5_local" / "best_1.pt")
+    def __init__(self, weights=None, device=None, inference_size=640, conf_thres=0.25, iou_thres=0.45,
+                 max_det=1000, jit=True, skip_threshold=3.0, max_skip=15):
+        # 推理输入尺寸（letterbox 的目标边长）
+        self.inference_size = inference_size
+        # NMS 参数
+        self.conf_thres = conf_thres
+        self.iou_thres = iou_thres
+        self.max_det = max_det
+        # 相似帧判定阈值（THUMB_SIZE 灰度缩略图的平均绝对差），<= 0 表示每帧都推理
+        self.skip_threshold = skip_threshold
+        # 连续复用结果的最大帧数，超过后强制推理一次，避免长时间静止画面中的局部变化被漏检
+        self.max_skip = max_skip
+        self._skipped = 0
+        self._ref_thumb = None  # 上一次推理时的缩略图
+        self._last_result = None  # 上一次推理的 (帧形状, 检测框, 标签文本)
+        # 标签文字尺寸缓存：{文字: ((宽, 高), 基线)}
+        self._text_size_cache = {}
+        # 复用的模型输入张量 (B, 3, H, W)
+        self._input_buf = None
+        # CPU 预处理的复用缓冲区（每个批次位置一组）：[((帧形状, auto), 几何参数, 缩放图, 填充图, CHW 图), ...]
+        self._lb_bufs = []
+        # GPU 上传用的锁页内存（每个批次位置一块）与独立的拷贝流
+        self._host_bufs = []
+        self._copy_stream = None
+        # 是否已把输入的 1/255 归一化折叠进第一层卷积的权重
+        self._scale_folded = False
 
+        # 单帧推理：算子内并行占满所有核心，算子间不并行
+        torch.set_num_threads(os.cpu_count() or 1)
         try:
-            # 从本地加载模型
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            # 已有并行任务启动后不能再设置，忽略即可
+            pass
+
+        if weights is None:
+            weights, default_device = select_weights()
+            device = device or default_device
+
+        try:
+            # 从本地加载模型，不套 AutoShape：直接得到 DetectMultiBackend，
+            # 它按权重后缀选择 PyTorch / TensorRT / ONNX Runtime 等后端，预处理与 NMS 由 detect() 自己完成
             self.model = torch.hub.load(
-                repo_or_dir=repo_dir,
+                repo_or_dir=str(YOLOV5_DIR),
                 model="custom",
-                path=weights_path,
+                path=str(weights),
                 source="local",
-                device="cpu"
+                device=device or "cpu",
+                autoshape=False
             )
         except Exception as e:
             print("Detector: 加载模型失败:", e)
             self.model = None
 
+        if self.model is not None:
+            self.stride = int(self.model.stride)
+            self.img_size = check_img_size(self.inference_size, s=self.stride)
+            # 类别名称（已经是中文）按索引展开成数组，检测时用类别下标数组一次取出
+            names = self.model.names
+            if self.model.engine and PT_WEIGHTS.exists():
+                # TensorRT 引擎不带类别元数据（DetectMultiBackend 只会给出 class0、class1…），
+                # 类别名称从 PyTorch 权重中读取
+                ckpt = torch.load(str(PT_WEIGHTS), map_location="cpu")
+                names = self.model.names = (ckpt.get("ema") or ckpt["model"]).names
+            self._names = np.array([names[i] for i in range(len(names))], dtype=object)
+            if self.model.pt:
+                # autoshape=False 时 hubconf 也不让 DetectMultiBackend 融合 Conv+BN，这里补上
+                # （其余处理都基于融合后的卷积）
+                self.model.model.fuse()
+            if self.model.pt and self.model.device.type == "cuda":
+                self._half_channels_last()
+            elif self.model.pt:
+                self._fold_input_scale()
+            # GPU 上先跑一次，提前完成 cuDNN / TensorRT 的初始化
+            self.model.warmup(imgsz=(1, 3, self.img_size, self.img_size))
+
+        if self.model is not None and jit:
+            self._trace_model()
+
+    def _half_channels_last(self):
+        """
+        GPU 上的 PyTorch 权重转为 FP16 + channels_last（NHWC），卷积走 Tensor Core 与 cuDNN 的 NHWC 实现。
+        DetectMultiBackend 按 fp16 标志把输入转为 half，输入缓冲区也按 channels_last 分配。
+        """
+        self.model.model.half().to(memory_format=torch.channels_last)
+        self.model.fp16 = True
+
+    def _fold_input_scale(self):
+        """
+        把输入的 /255 折叠进第一层卷积：conv(x / 255, w) == conv(x, w / 255)，
+        CPU 推理时省去一次整张输入张量的读写。零填充不受影响，偏置不变。
+        仅用于 FP32：FP16 下 w / 255 容易落入非规格化数损失精度，GPU 路径的 /255 已在类型转换时一并完成。
+        """
+        try:
+            conv = self.model.model.model[0].conv  # DetectionModel -> Sequential -> 第一层 Conv -> nn.Conv2d
+            with torch.no_grad():
+                conv.weight.div_(255)
+            self._scale_folded = True
+        except Exception as e:
+            print("Detector: 归一化折叠失败，继续在预处理中除以 255:", e)
+
+    def _trace_model(self):
+        """用 _TracedModel 替换 DetectMultiBackend 内部的检测网络，首次推理时按实际输入形状追踪"""
+        if self.model.pt:
+            self.model.model = _TracedModel(self.model.model.eval())
+
+    def _text_size(self, txt):
+        """cv2.getTextSize 的结果只取决于字符串本身（字体参数固定），按字符串缓存"""
+        size = self._text_size_cache.get(txt)
+        if size is None:
+            if len(self._text_size_cache) >= TEXT_SIZE_CACHE_MAX:
+                self._text_size_cache.clear()
+            size = cv2.getTextSize(txt, LABEL_FONT, LABEL_FONT_SCALE, LABEL_FONT_THICKNESS)
+            self._text_size_cache[txt] = size
+        return size
+
+    def _is_similar_to_last(self, frame_bgr):
+        """
+        用灰度缩略图的平均绝对差判断当前帧与上一次真正推理的帧是否几乎相同。
+        与“上一次推理的帧”而非“上一帧”比较，缓慢变化累积到阈值后仍会重新推理；
+        连续复用 max_skip 帧后也会强制推理一次。
+        """
+        thumb = cv2.cvtColor(cv2.resize(frame_bgr, (THUMB_SIZE, THUMB_SIZE), interpolation=cv2.INTER_AREA),
+                             cv2.COLOR_BGR2GRAY)
+        similar = (
+            self.skip_threshold > 0
+            and self._skipped < self.max_skip
+            and self._ref_thumb is not None
+            and self._last_result is not None
+            and self._last_result[0] == frame_bgr.shape
+            and np.mean(np.abs(thumb.astype(np.int16) - self._ref_thumb)) < self.skip_threshold
+        )
+        if similar:
+            self._skipped += 1
+        else:
+            self._ref_thumb = thumb.astype(np.int16)
+            self._skipped = 0
+        return similar
+
+    def _infer(self, frame_bgr):
+        """推理单帧，返回原图坐标下的检测框 (N, 4) int32 与对应的标签文本列表"""
+        return self._infer_batch([frame_bgr])[0]
+
+    def _infer_batch(self, frames):
+        """
+        将多帧拼成一个 (B, 3, H, W) 批次做一次前向推理，返回每帧的 (检测框, 标签文本)。
+        TensorRT 引擎只支持导出时的批大小（导出时加 --dynamic 才能接受任意批大小）。
+        """
+        # letterbox 一次完成缩放与填充：单帧的 PyTorch 权重只填充到 stride 的倍数；
+        # 多帧时统一填充成方形，保证各帧形状一致；TensorRT 引擎需要固定的方形输入
+        auto = self.model.pt and len(frames) == 1
+
+        # 推理：inference_mode 下不创建 autograd 元数据和版本计数
+        with torch.inference_mode():
+            if self.model.device.type == "cuda":
+                # GPU：只上传原始 uint8 帧，缩放 / 填充 / 换通道 / 归一化都在显存里完成
+                geoms = [letterbox_geometry(f.shape, self.img_size, self.stride, auto) for f in frames]
+                x = self._input_buffer(len(frames), geoms[0][0])
+                uploads = self._upload(frames)
+                for i, ((src, done), (_, unpad, pad)) in enumerate(zip(uploads, geoms)):
+                    # 只等待本帧的拷贝，后续帧的上传与本帧的预处理重叠
+                    torch.cuda.current_stream().wait_event(done)
+                    src.record_stream(torch.cuda.current_stream())
+                    self._preprocess_gpu(src, x[i], unpad, pad)
+            else:
+                ims = [self._letterbox_cpu(i, f, auto) for i, f in enumerate(frames)]
+                x = self._input_buffer(len(ims), ims[0].shape[1:])
+                for i, im in enumerate(ims):
+                    x[i] = torch.from_numpy(im)
+                if not self._scale_folded:
+                    x /= 255
+
+            with torch.autocast("cuda", dtype=torch.float16, enabled=self.model.pt and x.is_cuda):
+                pred = self.model(x)
+            if isinstance(pred, (list, tuple)):
+                pred = pred[0]
+            pred = pred.float()  # NMS 与坐标映射保持 FP32 精度
+            # NMS 与坐标映射（含取整）都在模型所在设备上完成
+            dets = self._nms(pred)
+            for det, f in zip(dets, frames):
+                det[:, :4] = scale_boxes(x.shape[2:], det[:, :4], f.shape).round()
+            # 整个批次只做一次设备到主机的拷贝（一次同步）
+            counts = [len(det) for det in dets]
+            arr = torch.cat(dets).cpu().numpy()
+
+        # 整个批次一次性按列切分、转整数、按下标取类别名，避免逐框 tolist()/int()
+        boxes = arr[:, :4].astype(np.int32)
+        labels = self._names[arr[:, 5].astype(np.int32)]
+        # 结果文本与框上标签共用同一个字符串，例如 "步行:0.85"
+        texts = ["%s:%.2f" % t for t in zip(labels.tolist(), arr[:, 4].tolist())]
+
+        # 再按每帧的检测数切开
+        results = []
+        start = 0
+        for n in counts:
+            results.append((boxes[start:start + n], texts[start:start + n]))
+            start += n
+        return results
+
+    def _nms(self, pred):
+        """
+        精简版 NMS：置信度筛选、按类别的 batched_nms 全部在 pred 所在设备上完成，不做中间的主机拷贝。
+        pred 为 (B, N, 5 + 类别数)，返回每帧一个 (n, 6) 张量：x1, y1, x2, y2, 置信度, 类别。
+        """
+        out = []
+        for x in pred:
+            x = x[x[:, 4] > self.conf_thres]
+            scores, cls = (x[:, 5:] * x[:, 4:5]).max(1)  # 置信度 = obj_conf * cls_conf
+            keep = scores > self.conf_thres
+            x, scores, cls = x[keep], scores[keep], cls[keep]
+            boxes = xywh2xyxy(x[:, :4])
+            keep = torchvision.ops.batched_nms(boxes, scores, cls, self.iou_thres)[:self.max_det]
+            out.append(torch.cat((boxes[keep], scores[keep, None], cls[keep, None].float()), 1))
+        return out
+
+    def _letterbox_cpu(self, i, frame_bgr, auto):
+        """
+        与 utils.augmentations.letterbox 等价的 CPU 预处理，返回批次位置 i 复用的 CHW RGB uint8 缓冲区。
+        视频帧形状在一次播放中不变：几何参数与缓冲区只在形状变化时重新计算和分配，
+        填充边框只写一次，之后每帧只覆盖中间的缩放区域。
+        """
+        key = (frame_bgr.shape, auto)
+        if i == len(self._lb_bufs):
+            self._lb_bufs.append(None)
+        if self._lb_bufs[i] is None or self._lb_bufs[i][0] != key:
+            geom = letterbox_geometry(frame_bgr.shape, self.img_size, self.stride, auto)
+            (out_h, out_w), (h, w), _ = geom
+            resized = np.empty((h, w, 3), np.uint8)
+            padded = np.full((out_h, out_w, 3), LETTERBOX_PAD, np.uint8)
+            chw = np.empty((3, out_h, out_w), np.uint8)
+            self._lb_bufs[i] = (key, geom, resized, padded, chw)
+        _, (_, (h, w), (top, left)), resized, padded, chw = self._lb_bufs[i]
+
+        if frame_bgr.shape[:2] != (h, w):
+            cv2.resize(frame_bgr, (w, h), dst=resized, interpolation=cv2.INTER_LINEAR)
+            src = resized
+        else:
+            src = frame_bgr
+        padded[top:top + h, left:left + w] = src
+        # HWC BGR -> CHW RGB：转置与通道翻转都是视图，一次 copyto 写入连续缓冲区
+        np.copyto(chw, padded.transpose((2, 0, 1))[::-1])
+        return chw
+
+    def _upload(self, frames):
+        """
+        经锁页内存在独立的 CUDA 流上异步上传原始 uint8 帧，返回 [(显存中的 HWC 张量, 拷贝完成事件), ...]。
+        锁页内存在上一批拷贝完成后才会被复用（推理前已等待所有事件）。
+        """
+        if self._copy_stream is None:
+            self._copy_stream = torch.cuda.Stream(device=self.model.device)
+        # 拷贝流需要等待之前提交到当前流上的工作，保证锁页内存已不再被读取
+        self._copy_stream.wait_stream(torch.cuda.current_stream())
+
+        uploads = []
+        for i, f in enumerate(frames):
+            if i == len(self._host_bufs):
+                self._host_bufs.append(None)
+            host = self._host_bufs[i]
+            if host is None or tuple(host.shape) != f.shape:
+                host = torch.empty(f.shape, dtype=torch.uint8, pin_memory=True)
+                self._host_bufs[i] = host
+            np.copyto(host.numpy(), f)
+            with torch.cuda.stream(self._copy_stream):
+                dev = host.to(self.model.device, non_blocking=True)
+                done = torch.cuda.Event()
+                done.record()
+            uploads.append((dev, done))
+        return uploads
+
+    @staticmethod
+    def _preprocess_gpu(src, out, unpad, pad):
+        """
+        在 GPU 上完成 letterbox + BGR->RGB + HWC->CHW + /255，直接写入输入张量 out (3, H, W)。
+        src 是显存中的 uint8 HWC BGR 帧；双线性缩放（align_corners=False）与 cv2.INTER_LINEAR 的采样方式一致。
+        """
+        src = src.permute(2, 0, 1).flip(0)[None].to(out.dtype)  # HWC BGR -> 1x3xHxW RGB
+        if tuple(src.shape[2:]) != tuple(unpad):
+            src = F.interpolate(src, size=unpad, mode="bilinear", align_corners=False)
+        (top, left), (h, w) = pad, unpad
+        out.fill_(LETTERBOX_PAD / 255)
+        out[:, top:top + h, left:left + w] = src[0] / 255
+
+    def _input_buffer(self, batch, hw):
+        """按 (批大小, 高, 宽) 复用模型输入张量，形状不变时不重新分配"""
+        shape = (batch, 3) + tuple(hw)
+        if self._input_buf is None or tuple(self._input_buf.shape) != shape:
+            dtype = torch.float16 if self.model.fp16 else torch.float32
+            self._input_buf = torch.empty(shape, dtype=dtype, device=self.model.device)
+            if self.model.fp16 and self.model.pt:
+                # 与 channels_last 的模型权重保持一致，避免每次卷积前做布局转换
+                self._input_buf = self._input_buf.contiguous(memory_format=torch.channels_last)
+        return self._input_buf
+
+    def _draw(self, frame_bgr, boxes, texts):
+        """在 frame_bgr 上就地绘制检测框和标签"""
+        if not len(boxes):
+            return
+
+        # 随机或固定颜色: BGR
+        color = (0, 255, 0)
+        # 所有检测框合并为一次 polylines 调用：(N, 4, 2) 的四个角点
+        rects = boxes[:, [0, 1, 2, 1, 2, 3, 0, 3]].reshape(-1, 4, 2)
+        cv2.polylines(frame_bgr, list(rects), True, color, 2)
+
+        # 在框上方写标签文字，文字尺寸按字符串缓存
+        sizes = [self._text_size(txt) for txt in texts]
+
+        # 所有文字背景合并为一次 fillPoly 调用
+        backgrounds = [
+            np.array([[x1, y1 - th - 4], [x1 + tw, y1 - th - 4], [x1 + tw, y1], [x1, y1]], np.int32)
+            for (x1, y1), ((tw, th), _) in zip(boxes[:, :2].tolist(), sizes)
+        ]
+        cv2.fillPoly(frame_bgr, backgrounds, color)
+
+        # 写白色文字
+        for (x1, y1), txt in zip(boxes[:, :2].tolist(), texts):
+            cv2.putText(frame_bgr, txt, (x1, y1 - 4),
+                        LABEL_FONT, LABEL_FONT_SCALE, (255, 255, 255), LABEL_FONT_THICKNESS, cv2.LINE_AA)
+
+    def summarize(self, texts):
+        """把标签文本列表拼成一个字符串，例如 “步行:0.85, 禁止超车:0.72”"""
+        if self.model is None:
+            return "未加载模型"
+        return ", ".join(texts) if texts else "未检测到目标"
+
+    def detect_boxes(self, frame_bgr):
+        """
+        只检测不绘制，返回原图坐标下的 (检测框 (N, 4) int32, 标签文本列表)，由调用方自行绘制。
+        与上一次推理的帧几乎相同时直接复用上次的检测结果。
+        """
+        if self.model is None:
+            return np.empty((0, 4), np.int32), []
+
+        if self._is_similar_to_last(frame_bgr):
+            _, boxes, texts = self._last_result
+        else:
+            boxes, texts = self._infer(frame_bgr)
+            self._last_result = (frame_bgr.shape, boxes, texts)
+        return boxes, texts
+
+    def detect_boxes_batch(self, frames):
+        """
+        一次推理多帧 BGR 图像，返回与输入顺序一致的 [(检测框, 标签文本), ...]，不绘制。
+        批量推理不做相似帧复用，适合缓冲的视频片段或多路摄像头。
+        """
+        if self.model is None:
+            return [(np.empty((0, 4), np.int32), []) for _ in frames]
+        if not frames:
+            return []
+
+        results = self._infer_batch(frames)
+        # 批量推理后，下一次单帧检测重新建立相似帧的参考
+        self._ref_thumb = None
+        self._last_result = None
+        return results
+
     def detect(self, frame_bgr):
         """
         对 BGR 图像进行检测，返回：
           - 带框的 BGR 图像
           - 文本描述（拼成一个字符串：例如 "步行:0.85, 禁止超车:0.72"）
+        与上一次推理的帧几乎相同时直接复用上次的检测结果，只重新绘制。
         """
-        if self.model is None:
-            return frame_bgr, "未加载模型"
-
-        # YOLOv5 要求 RGB 输入
-        frame_rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
-
-        # 推理
-        results = self.model(frame_rgb)
-        detections = results.xyxy[0]  # Nx6: x1,y1,x2,y2,conf,cls
-
-        texts = []
-        if detections is not None and len(detections):
-            # 遍历所有检测框，画矩形和标签
-            for det in detections:
-                x1, y1, x2, y2, conf, cls_idx = det.tolist()
-                x1, y1, x2, y2 = map(int, (x1, y1, x2, y2))
-                conf = float(conf)
-                cls_idx = int(cls_idx)
-
-                # 从 model.names 中获取类别名称（已经是中文）
-                label = self.model.names[cls_idx]
-                texts.append(f"{label}:{conf:.2f}")
-
-                # 随机或固定颜色: BGR
-                color = (0, 255, 0)
-                # 画矩形
-                cv2.rectangle(frame_bgr, (x1, y1), (x2, y2), color, 2)
-
-                # 在框上方写标签文字
-                txt = f"{label} {conf:.2f}"
-                # 计算文字大小
-                (txt_w, txt_h), baseline = cv2.getTextSize(txt, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 1)
-                # 画填充矩形作为文字背景
-                cv2.rectangle(frame_bgr, (x1, y1 - txt_h - 4), (x1 + txt_w, y1), color, -1)
-                # 写白色文字
-                cv2.putText(frame_bgr, txt, (x1, y1 - 4),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1, cv2.LINE_AA)
-
-        text_str = ", ".join(texts) if texts else "未检测到目标"
-        return frame_bgr, text_str
+        boxes, texts = self.detect_boxes(frame_bgr)
+        self._draw(frame_bgr, boxes, texts)
+        return frame_bgr, self.summarize(texts)
+
+    def detect_batch(self, frames):
+        """一次推理并绘制多帧 BGR 图像，返回与输入顺序一致的 [(带框的 BGR 图像, 文本描述), ...]"""
+        out = []
+        for f, (boxes, texts) in zip(frames, self.detect_boxes_batch(frames)):
+            self._draw(f, boxes, texts)
+            out.append((f, self.summarize(texts)))
+        return out
@@ -6,6 +6,7 @@
 """
 import sys
 import cv2
+import numpy as np
 from datetime import datetime
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QLabel, QPushButton,
@@ -17,7 +18,20 @@ from PyQt5.QtPrintSupport import QPrinter, QPrintDialog
 from PyQt5.QtCore import Qt, QTimer, QTime
 from PyQt5.QtGui import QImage, QPixmap
 
-from detector import Detector  # 自定义的检测逻辑，需实现 detect(frame) -> (frame_with_boxes, text)
+from capture_worker import CaptureWorker, open_capture  # 在后台线程读取视频/摄像头帧
+from detect_worker import DetectWorker  # 在后台线程运行 Detector.detect(frame) -> (frame_with_boxes, text)
+
+# 界面刷新间隔（毫秒）：固定 30 Hz，与视频帧率无关
+UI_REFRESH_MS = 1000 // 30
+
+# 识别结果文本框的批量刷新间隔（毫秒）
+LOG_FLUSH_MS = 250
+
+# Qt 5.14 起支持 QImage.Format_BGR888，可直接显示 OpenCV 的 BGR 帧
+HAS_BGR888 = hasattr(QImage, 'Format_BGR888')
+
+# BGR -> 三通道灰度的变换矩阵：每个输出通道都是 0.114*B + 0.587*G + 0.299*R
+GRAY3_MATRIX = np.array([[0.114, 0.587, 0.299]] * 3, dtype=np.float32)
 
 
 class StyleSheet:
@@ -96,6 +110,10 @@ class StyleSheet:
         }
     """
 
+    # 各面板标题的样式（多个标题共用同一个字符串常量）
+    TITLE_STYLE = "font-size: 18px; font-weight: bold; margin-bottom: 15px;"
+    SUBTITLE_STYLE = "font-size: 16px; font-weight: bold; margin-bottom: 10px;"
+
 
 class MainWindow(QMainWindow):
     """主窗口类"""
@@ -106,8 +124,16 @@ class MainWindow(QMainWindow):
         self.is_playing = False
         self.current_frame = 0
 
-        # 检测器
-        self.detector = Detector()
+        # 检测线程：推理在后台完成，结果通过信号回到 GUI 线程
+        self.detect_worker = DetectWorker()
+        self.detect_worker.frame_ready.connect(self._on_detected)
+        self.detect_worker.start()
+
+        # 最近一次取到的原始帧，供“保存”使用，避免再次 read() 抢走播放中的帧
+        self._last_frame = None
+
+        # 复用的 RGB 转换缓冲区（不支持 Format_BGR888 时使用），避免每帧重新分配 H*W*3 字节
+        self._rgb_buf = None
 
         self.initUI()
 
@@ -147,7 +173,7 @@ class MainWindow(QMainWindow):
         # 控制面板标题
         control_title = QLabel("控制面板")
         control_title.setAlignment(Qt.AlignCenter)
-        control_title.setStyleSheet("font-size: 18px; font-weight: bold; margin-bottom: 15px;")
+        control_title.setStyleSheet(StyleSheet.TITLE_STYLE)
         left_layout.addWidget(control_title)
 
         # 控制按钮
@@ -220,7 +246,7 @@ class MainWindow(QMainWindow):
         # 日志显示区域
         log_title = QLabel("运行日志")
         log_title.setAlignment(Qt.AlignCenter)
-        log_title.setStyleSheet("font-size: 16px; font-weight: bold; margin-bottom: 10px;")
+        log_title.setStyleSheet(StyleSheet.SUBTITLE_STYLE)
         left_layout.addWidget(log_title)
 
         self.log_text = QPlainTextEdit()
@@ -249,7 +275,7 @@ class MainWindow(QMainWindow):
 
         video_title = QLabel("视频预览")
         video_title.setAlignment(Qt.AlignCenter)
-        video_title.setStyleSheet("font-size: 18px; font-weight: bold; margin-bottom: 15px;")
+        video_title.setStyleSheet(StyleSheet.TITLE_STYLE)
         video_layout.addWidget(video_title)
 
         self.video_label = QLabel()
@@ -294,7 +320,7 @@ class MainWindow(QMainWindow):
 
         result_title = QLabel("识别结果")
         result_title.setAlignment(Qt.AlignCenter)
-        result_title.setStyleSheet("font-size: 18px; font-weight: bold; margin-bottom: 15px;")
+        result_title.setStyleSheet(StyleSheet.TITLE_STYLE)
         right_layout.addWidget(result_title)
 
         # 用于输出检测结果的文本框
@@ -320,11 +346,20 @@ class MainWindow(QMainWindow):
         # 设置信号连接
         self.setup_connections()
 
-        # 初始化摄像头 & 定时器
+        # 初始化摄像头、采集线程 & 定时器
         self.processor = None
+        self.capture_worker = None
         self.timer = QTimer()
+        # 精确定时器：默认的 CoarseTimer 允许 5% 误差，33ms 的刷新周期会抖动
+        self.timer.setTimerType(Qt.PreciseTimer)
         self.timer.timeout.connect(self.update_frame)
 
+        # 识别结果先缓存，定时批量写入文本框，避免每帧触发一次文档重排和滚动
+        self._log_buffer = []
+        self._log_flush_timer = QTimer()
+        self._log_flush_timer.timeout.connect(self._flush_log)
+        self._log_flush_timer.start(LOG_FLUSH_MS)
+
         # 状态栏
         status = QStatusBar()
         self.setStatusBar(status)
@@ -368,13 +403,12 @@ class MainWindow(QMainWindow):
         if not path:
             return
 
-        # 如果已有捕获对象，先释放
-        if self.processor:
-            self.processor.release()
-            self.processor = None
+        # 如果已有捕获对象，先停止采集线程并释放
+        self._release_video()
+        self._last_frame = None
 
-        # 用 OpenCV 打开视频
-        self.processor = cv2.VideoCapture(path)
+        # 用 OpenCV 打开视频（优先硬件解码）
+        self.processor = open_capture(path)
         if not self.processor.isOpened():
             self.statusBar().showMessage("无法打开视频文件")
             return
@@ -394,16 +428,17 @@ class MainWindow(QMainWindow):
 
         # 清空输出框
         self.output_text.clear()
+        self._log_buffer.clear()
         self.statusBar().showMessage("视频已打开，播放并实时检测…")
 
-        # 启动定时器
-        self.timer.start(int(1000 / self.fps))
+        # 采集线程按视频帧率读取，界面定时器以固定频率拉取最新帧
+        self._start_capture(self.fps)
 
     def _toggle_play(self):
         """开始/暂停播放或实时监测"""
         if not self.processor:
             # 如果没有视频源，则打开摄像头进行实时监测
-            self.processor = cv2.VideoCapture(0)
+            self.processor = open_capture(0)
             if not self.processor.isOpened():
                 self.log_message("无法打开摄像头")
                 self.processor = None
@@ -413,72 +448,69 @@ class MainWindow(QMainWindow):
             self.slider.setEnabled(False)
             self.time_label.setText("实时 / 实时")
             self.output_text.clear()
+            self._log_buffer.clear()
             self.statusBar().showMessage("开始摄像头实时监测")
-            self.timer.start(int(1000 / 30))
+            # 摄像头 read() 本身按采集帧率阻塞，无需限速，也不循环
+            self._start_capture(None, loop=False)
             return
 
         # 如果已有视频或摄像头正在播放/检测，则切换暂停/继续
         if self.timer.isActive():
             self.timer.stop()
+            self.capture_worker.pause()
             self.is_playing = False
             self.statusBar().showMessage("已暂停")
         else:
             self.is_playing = True
-            fps = self.fps if self.video_source else 30
-            self.timer.start(int(1000 / fps))
+            self.capture_worker.resume()
+            self.timer.start(UI_REFRESH_MS)
             self.statusBar().showMessage("播放/检测中…")
 
+    def _start_capture(self, fps, loop=True):
+        """为当前 self.processor 启动采集线程和界面刷新定时器"""
+        self.capture_worker = CaptureWorker(self.processor, fps, loop=loop)
+        self.capture_worker.start()
+        self.timer.start(UI_REFRESH_MS)
+
+    def _release_video(self):
+        """停止采集线程后再释放 VideoCapture，避免与后台读取冲突"""
+        self.timer.stop()
+        if self.capture_worker is not None:
+            self.capture_worker.stop()
+            self.capture_worker.wait()
+            self.capture_worker = None
+        if self.processor is not None:
+            self.processor.release()
+            self.processor = None
+
     def _seek_frame(self, f):
         """本地视频跳转到指定帧"""
         if not self.processor or not self.video_source:
             return
-        self.processor.set(cv2.CAP_PROP_POS_FRAMES, f)
+        self.capture_worker.seek(f)
 
     def update_frame(self):
-        """定时回调：读取一帧，调用检测，并更新界面与输出"""
-        if not self.processor:
+        """定时回调：取采集线程最新的一帧，提交检测，并更新界面"""
+        if not self.capture_worker:
             return
 
-        ret, frame = self.processor.read()
-        if not ret:
-            # 如果是本地视频播放到末尾，循环播放
-            if self.video_source:
-                self.processor.set(cv2.CAP_PROP_POS_FRAMES, 0)
-                self.current_frame = 0
-                ret, frame = self.processor.read()
-                if not ret:
-                    return
-            else:
-                return
+        # 检测或界面落后时中间帧直接丢弃，只处理最新帧
+        latest = self.capture_worker.read_latest()
+        if latest is None:
+            return
+        frame, pos = latest
+        # 检测线程会在帧上就地画框，保存用的原始帧需单独拷贝一份
+        self._last_frame = frame.copy()
 
-        # 灰度显示
+        # 灰度显示：一次 cv2.transform 直接得到三通道灰度图，省去 BGR->GRAY->BGR 两次整帧转换
         if self.gray_checkbox.isChecked():
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
-
-        # 检测并获得带框图像与结果文本
-        frame_with_boxes, text = self.detector.detect(frame)
-
-        # 转为 Qt 格式并显示
-        rgb_frame = cv2.cvtColor(frame_with_boxes, cv2.COLOR_BGR2RGB)
-        h, w, ch = rgb_frame.shape
-        bytes_per_line = ch * w
-        q_image = QImage(rgb_frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
-        self.video_label.setPixmap(QPixmap.fromImage(q_image).scaled(
-            self.video_label.width(),
-            self.video_label.height(),
-            Qt.KeepAspectRatio,
-            Qt.SmoothTransformation
-        ))
+            frame = cv2.transform(frame, GRAY3_MATRIX)
 
-        # 追加检测结果到右侧文本框
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        self.output_text.appendPlainText(f"[{timestamp}] {text}")
-        self.output_text.verticalScrollBar().setValue(self.output_text.verticalScrollBar().maximum())
+        # 交给检测线程处理，带框图像与结果文本由 _on_detected 显示
+        self.detect_worker.submit(frame)
 
         # 本地视频同步更新滑动条和时间标签
         if self.video_source:
-            pos = int(self.processor.get(cv2.CAP_PROP_POS_FRAMES))
             self.slider.blockSignals(True)
             self.slider.setValue(pos)
             self.slider.blockSignals(False)
@@ -486,20 +518,64 @@ class MainWindow(QMainWindow):
             tot = QTime(0, 0, 0).addMSecs(int(self.total_frames / self.fps * 1000))
             self.time_label.setText(f"{cur.toString('hh:mm:ss')} / {tot.toString('hh:mm:ss')}")
 
+    def _on_detected(self, frame_with_boxes, text):
+        """检测线程回调：显示带框图像并追加结果文本"""
+        # 大倍率缩小时（目标不足原图一半）先用 cv2 的 INTER_AREA 缩到约 2 倍目标尺寸，
+        # 再交给 Qt 用 FastTransformation 缩放，避免在 GUI 线程对整帧做双线性插值
+        label_w, label_h = self.video_label.width(), self.video_label.height()
+        h, w = frame_with_boxes.shape[:2]
+        scale = min(label_w / w, label_h / h)
+        transform = Qt.SmoothTransformation
+        if scale < 0.5:
+            frame_with_boxes = cv2.resize(frame_with_boxes, (int(w * scale * 2), int(h * scale * 2)),
+                                          interpolation=cv2.INTER_AREA)
+            transform = Qt.FastTransformation
+
+        # 转为 Qt 格式并显示（QImage 不拷贝数据，缓冲区在 QPixmap.fromImage 拷贝前必须有效）
+        h, w, ch = frame_with_boxes.shape
+        if HAS_BGR888:
+            # Qt 5.14+ 可直接显示 BGR 数据，省去整帧 cvtColor；行跨度取自 ndarray 本身
+            q_image = QImage(frame_with_boxes.data, w, h, frame_with_boxes.strides[0], QImage.Format_BGR888)
+        else:
+            if self._rgb_buf is None or self._rgb_buf.shape != frame_with_boxes.shape:
+                self._rgb_buf = np.empty(frame_with_boxes.shape, dtype=np.uint8)
+            rgb_frame = cv2.cvtColor(frame_with_boxes, cv2.COLOR_BGR2RGB, dst=self._rgb_buf)
+            q_image = QImage(rgb_frame.data, w, h, rgb_frame.strides[0], QImage.Format_RGB888)
+        # NoFormatConversion：直接按 QImage 的像素格式生成 QPixmap，不额外做一次格式转换拷贝
+        self.video_label.setPixmap(QPixmap.fromImage(q_image, Qt.NoFormatConversion).scaled(
+            label_w,
+            label_h,
+            Qt.KeepAspectRatio,
+            transform
+        ))
+
+        # 检测结果先放入缓冲，由 _flush_log 批量追加到右侧文本框
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self._log_buffer.append(f"[{timestamp}] {text}")
+
+    def _flush_log(self):
+        """把缓冲的检测结果一次性追加到右侧文本框，并只滚动一次到底部"""
+        if not self._log_buffer:
+            return
+        self.output_text.appendPlainText("\n".join(self._log_buffer))
+        self._log_buffer.clear()
+        self.output_text.verticalScrollBar().setValue(self.output_text.verticalScrollBar().maximum())
+
     def save_frame(self):
         """保存当前帧"""
         if self.processor is not None:
-            ret, frame = self.processor.read()
-            if ret:
-                file_name, _ = QFileDialog.getSaveFileName(
-                    self,
-                    "保存图像",
-                    "",
-                    "图像文件 (*.png *.jpg);;所有文件 (*.*)"
-                )
-                if file_name:
-                    cv2.imwrite(file_name, frame)
-                    self.log_message(f"图像已保存至: {file_name}")
+            if self._last_frame is None:
+                return
+            frame = self._last_frame
+            file_name, _ = QFileDialog.getSaveFileName(
+                self,
+                "保存图像",
+                "",
+                "图像文件 (*.png *.jpg);;所有文件 (*.*)"
+            )
+            if file_name:
+                cv2.imwrite(file_name, frame)
+                self.log_message(f"图像已保存至: {file_name}")
         else:
             self.log_message("没有可用的视频源")
 
@@ -520,10 +596,10 @@ class MainWindow(QMainWindow):
             self.log_message("取消打印")
 
     def closeEvent(self, event):
-        """窗口关闭事件：释放摄像头/视频"""
-        if self.processor is not None:
-            self.processor.release()
-            self.processor = None
+        """窗口关闭事件：停止采集与检测线程，释放摄像头/视频"""
+        self._release_video()
+        self.detect_worker.stop()
+        self.detect_worker.wait()
         event.accept()
 
 
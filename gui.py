@@ -1,15 +1,34 @@
 # gui.py
 import sys
 import cv2
+import numpy as np
 from datetime import datetime
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QLabel, QPushButton, QVBoxLayout, QHBoxLayout,
     QTextEdit, QSplitter, QFileDialog, QStatusBar, QSizePolicy, QSlider, QTabWidget, QListWidget
 )
 from PyQt5.QtCore import Qt, QTimer, QTime
-from PyQt5.QtGui import QImage, QPixmap, QFont
+from PyQt5.QtGui import QImage, QPixmap, QFont, QTextCursor, QPainter, QPen, QColor
 
-from detector import Detector  # 自定义的检测逻辑
+from capture_worker import CaptureWorker, open_capture  # 在后台线程按视频帧率读取帧
+from detect_worker import DetectWorker  # 在后台线程运行自定义的检测逻辑
+
+# 界面刷新间隔（毫秒）：固定 30 Hz，与视频帧率无关
+UI_REFRESH_MS = 1000 // 30
+# 检测结果写入文本框的批量刷新间隔（毫秒）
+LOG_FLUSH_MS = 200
+
+# 视频显示区域与按钮的样式常量
+VIDEO_LABEL_STYLE = "border:2px dashed #999; background:#f5f5f5; color:#666;"
+VIDEO_LABEL_FONT_SIZE = 20
+BUTTON_MIN_HEIGHT = 40
+# 检测框叠加层：在显示尺寸的 QPixmap 上绘制，颜色与 Detector._draw 一致（绿色框、白色文字）
+OVERLAY_COLOR = QColor(0, 255, 0)
+OVERLAY_TEXT_COLOR = QColor(255, 255, 255)
+OVERLAY_FONT_PIXELS = 14
+
+# Qt 5.14 起支持 QImage.Format_BGR888，可直接显示 OpenCV 的 BGR 帧
+HAS_BGR888 = hasattr(QImage, 'Format_BGR888')
 
 
 class TrafficSignUI(QMainWindow):
@@ -20,11 +39,31 @@ class TrafficSignUI(QMainWindow):
 
         # 视频相关
         self.processor = None
+        self.capture_worker = None
         self.timer = QTimer()
+        # 精确定时器：默认的 CoarseTimer 允许 5% 误差，33ms 的刷新周期会抖动
+        self.timer.setTimerType(Qt.PreciseTimer)
         self.timer.timeout.connect(self.update_frame)
 
-        # 检测器
-        self.detector = Detector()
+        # 检测线程：推理在后台完成，只返回检测框，由 GUI 线程在缩放后的画面上绘制
+        self.detect_worker = DetectWorker(draw=False)
+        self.detect_worker.detections_ready.connect(self._on_detected)
+        self.detect_worker.start()
+
+        # 复用的 RGB 转换缓冲区（不支持 Format_BGR888 时使用），避免每帧重新分配 H*W*3 字节
+        self._rgb_buf = None
+        # 显示尺寸缓存：只在标签或视频尺寸变化时重新计算；缩放结果写入复用的缓冲区
+        self._display_size = None  # (宽, 高)
+        self._display_key = None  # (帧形状, 标签宽, 标签高)
+        self._display_buf = None
+        self._qimg_buf = None
+
+        # 视频区域的提示字体只创建一次，供 _setup_ui 使用
+        self._big_font = QFont()
+        self._big_font.setPointSize(VIDEO_LABEL_FONT_SIZE)
+        self._overlay_font = QFont()
+        self._overlay_font.setPixelSize(OVERLAY_FONT_PIXELS)
+        self._overlay_pen = QPen(OVERLAY_COLOR, 2)
 
         self._setup_ui()
 
@@ -45,10 +84,8 @@ class TrafficSignUI(QMainWindow):
         self.video_label = QLabel('请点击“打开视频”选择文件')
         self.video_label.setAlignment(Qt.AlignCenter)
         self.video_label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-        self.video_label.setStyleSheet("border:2px dashed #999; background:#f5f5f5; color:#666;")
-        font = QFont()
-        font.setPointSize(20)
-        self.video_label.setFont(font)
+        self.video_label.setStyleSheet(VIDEO_LABEL_STYLE)
+        self.video_label.setFont(self._big_font)
         v_layout.addWidget(self.video_label)
 
         ctrl = QHBoxLayout()
@@ -70,7 +107,7 @@ class TrafficSignUI(QMainWindow):
         ]:
             btn = QPushButton(text)
             btn.setToolTip(tip)
-            btn.setMinimumHeight(40)
+            btn.setMinimumHeight(BUTTON_MIN_HEIGHT)
             btn.clicked.connect(slot)
             btns.addWidget(btn)
         v_layout.addLayout(btns)
@@ -89,6 +126,11 @@ class TrafficSignUI(QMainWindow):
         # 关键：限制文档最多保留 100 个 block（即大概 100 行）
         self.info_text.document().setMaximumBlockCount(100)
         res_layout.addWidget(self.info_text)
+        # 检测结果先进缓冲区，由定时器批量写入，避免每帧触发一次文档重排
+        self._log_buffer = []
+        self._log_flush_timer = QTimer()
+        self._log_flush_timer.timeout.connect(self._flush_log)
+        self._log_flush_timer.start(LOG_FLUSH_MS)
         tabs.addTab(result_tab, "检测结果")
 
         # “历史记录” 页
@@ -112,8 +154,11 @@ class TrafficSignUI(QMainWindow):
         if not path:
             return
 
-        # 用 OpenCV 打开视频
-        self.processor = cv2.VideoCapture(path)
+        # 如果已有视频在播放，先停止采集线程并释放
+        self._release_video()
+
+        # 用 OpenCV 打开视频（优先硬件解码）
+        self.processor = open_capture(path)
         if not self.processor.isOpened():
             self.statusBar().showMessage("无法打开视频文件")
             return
@@ -128,54 +173,56 @@ class TrafficSignUI(QMainWindow):
 
         # 清空 QTextEdit
         self.info_text.clear()
+        self._log_buffer.clear()
         self.statusBar().showMessage("视频已打开，正在播放并实时检测…")
-        self.timer.start(int(1000 / self.fps))
+
+        # 采集线程按视频帧率读取，界面定时器以固定频率拉取最新帧
+        self.capture_worker = CaptureWorker(self.processor, self.fps)
+        self.capture_worker.start()
+        self.timer.start(UI_REFRESH_MS)
+
+    def _release_video(self):
+        """停止采集线程后再释放 VideoCapture，避免与后台读取冲突"""
+        self.timer.stop()
+        if self.capture_worker is not None:
+            self.capture_worker.stop()
+            self.capture_worker.wait()
+            self.capture_worker = None
+        if self.processor is not None:
+            self.processor.release()
+            self.processor = None
 
     def _toggle_play(self):
         if not self.processor:
             return
         if self.timer.isActive():
             self.timer.stop()
+            self.capture_worker.pause()
             self.statusBar().showMessage("已暂停")
         else:
-            self.timer.start(int(1000 / self.fps))
+            self.capture_worker.resume()
+            self.timer.start(UI_REFRESH_MS)
             self.statusBar().showMessage("播放中…")
 
     def _seek_frame(self, f):
         if not self.processor:
             return
-        self.processor.set(cv2.CAP_PROP_POS_FRAMES, f)
+        self.capture_worker.seek(f)
 
     def update_frame(self):
-        if not self.processor:
+        if not self.capture_worker:
             return
 
-        ret, frame = self.processor.read()
-        if not ret:
-            # 播放到末尾后，循环从头开始
-            self.processor.set(cv2.CAP_PROP_POS_FRAMES, 0)
-            ret, frame = self.processor.read()
-            if not ret:
-                print("无法重新读取第一帧")
-                return
-
-        # 调用检测逻辑，得到带框的 frame 和文字描述 text
-        frame_with_boxes, text = self.detector.detect(frame)
-
-        # 拼接当前时间
-        current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        text_with_time = f"[{current_time}] {text}"
-
-        # 通过 append() 追加日志，QTextEdit 会自动维护“最多保留 100 行”
-        self.info_text.append(text_with_time)
-        # 保证滚动条滚动到最底部
-        self.info_text.verticalScrollBar().setValue(self.info_text.verticalScrollBar().maximum())
+        # 只取采集线程最新的一帧；检测或界面落后时中间帧直接丢弃
+        latest = self.capture_worker.read_latest()
+        if latest is None:
+            return
+        frame, pos = latest
 
-        # 在 QLabel 上显示带框的图像
-        self.show_frame_on_label(frame_with_boxes)
+        # 交给检测线程处理，结果由 _on_detected 显示
+        self.detect_worker.submit(frame)
 
         # 同步更新滑动条与时间标签
-        pos = int(self.processor.get(cv2.CAP_PROP_POS_FRAMES))
         self.slider.blockSignals(True)
         self.slider.setValue(pos)
         self.slider.blockSignals(False)
@@ -183,18 +230,95 @@ class TrafficSignUI(QMainWindow):
         tot = QTime(0, 0, 0).addMSecs(int(self.total_frames / self.fps * 1000))
         self.time_label.setText(f"{cur.toString('hh:mm:ss')} / {tot.toString('hh:mm:ss')}")
 
-    def show_frame_on_label(self, frame):
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        h, w, ch = frame_rgb.shape
-        bytes_per_line = ch * w
-        image = QImage(frame_rgb.data, w, h, bytes_per_line, QImage.Format_RGB888)
-        scaled_image = image.scaled(self.video_label.width(), self.video_label.height(), Qt.KeepAspectRatio)
-        self.video_label.setPixmap(QPixmap.fromImage(scaled_image))
+    def _on_detected(self, frame, boxes, texts, text):
+        """收到检测线程的结果（原始 frame、检测框、标签与文字描述 text），更新界面"""
+        # 拼接当前时间，先放入缓冲，由 _flush_log 批量追加
+        current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self._log_buffer.append(f"[{current_time}] {text}")
+
+        # 在 QLabel 上显示图像，并在显示尺寸上叠加检测框
+        self.show_frame_on_label(frame, boxes, texts)
+
+    def _flush_log(self):
+        """把缓冲的检测结果用一次 insertText 追加到文本框末尾，QTextEdit 自动维护“最多保留 100 行”"""
+        if not self._log_buffer:
+            return
+        doc = self.info_text.document()
+        cursor = QTextCursor(doc)
+        cursor.movePosition(QTextCursor.End)
+        if not doc.isEmpty():
+            cursor.insertBlock()
+        cursor.insertText("\n".join(self._log_buffer))
+        self._log_buffer.clear()
+        # 移动视图光标到末尾即可自动滚动，不再单独设置滚动条
+        self.info_text.moveCursor(QTextCursor.End)
+
+    def _fit_size(self, frame):
+        """
+        按 QLabel 当前尺寸计算保持宽高比的显示尺寸，结果缓存到标签或视频尺寸变化为止。
+        标签在 QSplitter 里，拖动分隔条时主窗口收不到 resizeEvent，所以缓存键直接包含标签尺寸。
+        """
+        key = (frame.shape, self.video_label.width(), self.video_label.height())
+        if key != self._display_key:
+            h, w = frame.shape[:2]
+            scale = min(self.video_label.width() / w, self.video_label.height() / h)
+            self._display_size = (max(1, int(w * scale)), max(1, int(h * scale)))
+            self._display_key = key
+        return self._display_size
+
+    def show_frame_on_label(self, frame, boxes=None, texts=None):
+        # 在 numpy 侧一次缩放到显示尺寸，Qt 不再对整帧做 scaled()；已是显示尺寸时直接使用
+        size = self._fit_size(frame)
+        scale = size[0] / frame.shape[1]
+        if (frame.shape[1], frame.shape[0]) != size:
+            if self._display_buf is None or self._display_buf.shape[:2] != (size[1], size[0]):
+                self._display_buf = np.empty((size[1], size[0], frame.shape[2]), dtype=np.uint8)
+            frame = cv2.resize(frame, size, dst=self._display_buf, interpolation=cv2.INTER_LINEAR)
+
+        # QImage 不拷贝数据，frame / self._rgb_buf 需在 QPixmap.fromImage 完成拷贝前保持有效
+        h, w, ch = frame.shape
+        if HAS_BGR888:
+            # Qt 5.14+ 可直接显示 BGR 数据，省去整帧 cvtColor；行跨度取自 ndarray 本身
+            image = QImage(frame.data, w, h, frame.strides[0], QImage.Format_BGR888)
+        else:
+            if self._rgb_buf is None or self._rgb_buf.shape != frame.shape:
+                self._rgb_buf = np.empty(frame.shape, dtype=np.uint8)
+            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb_buf)
+            image = QImage(frame_rgb.data, w, h, frame_rgb.strides[0], QImage.Format_RGB888)
+        # 保留 QImage 引用的缓冲区直到 QPixmap 拷贝完成；NoFormatConversion 避免转换像素格式时再拷贝一次
+        self._qimg_buf = frame
+        pixmap = QPixmap.fromImage(image, Qt.NoFormatConversion)
+        if boxes is not None and len(boxes):
+            self._paint_overlay(pixmap, boxes, texts, scale)
+        self.video_label.setPixmap(pixmap)
+
+    def _paint_overlay(self, pixmap, boxes, texts, scale):
+        """用 QPainter 在显示尺寸的 pixmap 上绘制检测框和标签，只触及框线与文字的像素"""
+        painter = QPainter(pixmap)
+        painter.setFont(self._overlay_font)
+        metrics = painter.fontMetrics()
+        th = metrics.height()
+        for (x1, y1, x2, y2), txt in zip((boxes * scale).astype(np.int32).tolist(), texts):
+            painter.setPen(self._overlay_pen)
+            painter.drawRect(x1, y1, x2 - x1, y2 - y1)
+            # 标签背景贴在框的上沿，背景上写白色文字
+            tw = metrics.horizontalAdvance(txt) if hasattr(metrics, 'horizontalAdvance') else metrics.width(txt)
+            painter.fillRect(x1, y1 - th, tw + 4, th, OVERLAY_COLOR)
+            painter.setPen(OVERLAY_TEXT_COLOR)
+            painter.drawText(x1 + 2, y1 - metrics.descent(), txt)
+        painter.end()
 
     def _toggle_overlay(self):
         # 如果日后需要用到叠加层开关，可在此添加逻辑
         pass
 
+    def closeEvent(self, event):
+        """窗口关闭时停止定时器、采集与检测线程并释放视频"""
+        self._release_video()
+        self.detect_worker.stop()
+        self.detect_worker.wait()
+        event.accept()
+
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
@@ -0,0 +1,113 @@
+# int8_engine.py
+"""
+用 TensorRT 的训练后量化（PTQ）把 ONNX 模型编译成 INT8 引擎，Detector 会优先加载它。
+校准图片默认取自 data/tsrd_dataset/images/train，校准结果缓存到 best_1_int8.cache，再次构建时直接复用。
+
+用法：
+    python yolov5_local/export.py --weights yolov5_local/best_1.pt --include onnx --imgsz 640
+    python int8_engine.py --images data/tsrd_dataset/images/train --num 500
+
+量化后需在验证集上确认 mAP 的下降在可接受范围内（一般不超过 1%）。
+"""
+import argparse
+import os
+from pathlib import Path
+
+import cv2
+import numpy as np
+import tensorrt as trt
+import torch
+
+from calib_images import collect_images
+from detector import INT8_ENGINE_WEIGHTS, ONNX_WEIGHTS, YOLOV5_DIR
+from utils.augmentations import letterbox
+
+CACHE_FILE = YOLOV5_DIR / "best_1_int8.cache"
+
+
+class EntropyCalibrator(trt.IInt8EntropyCalibrator2):
+    """按 Detector 相同的预处理（letterbox + RGB + CHW + /255）依次提供校准批次，显存缓冲区用 torch 分配"""
+
+    def __init__(self, image_paths, input_shape, cache_file):
+        super().__init__()
+        self.image_paths = image_paths
+        self.batch_size, _, self.h, self.w = input_shape
+        self.cache_file = Path(cache_file)
+        self._index = 0
+        self._device_buf = torch.empty(tuple(input_shape), dtype=torch.float32, device="cuda")
+
+    def _load(self, path):
+        im = letterbox(cv2.imread(str(path)), (self.h, self.w), auto=False)[0]
+        return np.ascontiguousarray(im.transpose((2, 0, 1))[::-1], dtype=np.float32) / 255
+
+    def get_batch_size(self):
+        return self.batch_size
+
+    def get_batch(self, names):
+        if self._index + self.batch_size > len(self.image_paths):
+            return None
+        paths = self.image_paths[self._index:self._index + self.batch_size]
+        self._index += self.batch_size
+        self._device_buf.copy_(torch.from_numpy(np.stack([self._load(p) for p in paths])))
+        return [int(self._device_buf.data_ptr())]
+
+    def read_calibration_cache(self):
+        if self.cache_file.exists():
+            return self.cache_file.read_bytes()
+        return None
+
+    def write_calibration_cache(self, cache):
+        self.cache_file.write_bytes(bytes(cache))
+
+
+def build_int8_engine(onnx_file, engine_file, image_paths, workspace=4, cache_file=CACHE_FILE):
+    """解析 ONNX 并以 INT8（同时允许 FP16 回退）构建序列化引擎"""
+    logger = trt.Logger(trt.Logger.INFO)
+    builder = trt.Builder(logger)
+    config = builder.create_builder_config()
+    if int(trt.__version__.split(".")[0]) >= 10:
+        config.set_memory_pool_limit(trt.MemoryPoolType.WORKSPACE, workspace << 30)
+    else:
+        config.max_workspace_size = workspace << 30
+
+    network = builder.create_network(1 << int(trt.NetworkDefinitionCreationFlag.EXPLICIT_BATCH))
+    parser = trt.OnnxParser(network, logger)
+    if not parser.parse_from_file(str(onnx_file)):
+        raise RuntimeError(f"解析 ONNX 文件失败: {onnx_file}")
+
+    input_shape = tuple(network.get_input(0).shape)
+    calibrator = EntropyCalibrator(image_paths, input_shape, cache_file)
+    config.set_flag(trt.BuilderFlag.INT8)
+    if builder.platform_has_fast_fp16:
+        config.set_flag(trt.BuilderFlag.FP16)  # 不适合量化的层回退到 FP16 而不是 FP32
+    config.int8_calibrator = calibrator
+
+    print(f"使用 {len(image_paths)} 张图片校准，输入形状 {input_shape}，开始构建 INT8 引擎…")
+    engine = builder.build_serialized_network(network, config)
+    if engine is None:
+        raise RuntimeError("构建 INT8 引擎失败")
+    with open(engine_file, "wb") as f:
+        f.write(engine)
+    print(f"INT8 引擎已保存: {engine_file}")
+    return engine_file
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="构建 INT8 TensorRT 引擎")
+    parser.add_argument("--onnx", default=str(ONNX_WEIGHTS), help="ONNX 模型路径")
+    parser.add_argument("--engine", default=str(INT8_ENGINE_WEIGHTS), help="输出引擎路径")
+    parser.add_argument("--images", default=str(Path(__file__).parent / "data" / "tsrd_dataset" / "images" / "train"),
+                        help="校准图片目录")
+    parser.add_argument("--num", type=int, default=500, help="校准图片数量")
+    parser.add_argument("--workspace", type=int, default=4, help="构建时的显存工作区大小（GB）")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    images = collect_images(args.images, args.num)
+    if not images:
+        raise SystemExit(f"未找到校准图片: {args.images}")
+    if not os.path.exists(args.onnx):
+        raise SystemExit(f"未找到 ONNX 模型，请先运行 export.py 导出: {args.onnx}")
+    build_int8_engine(args.onnx, args.engine, images, args.workspace)
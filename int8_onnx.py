@@ -0,0 +1,102 @@
+# int8_onnx.py
+"""
+用 ONNX Runtime 的静态量化（QDQ 格式，权重按通道 INT8）生成 CPU 推理用的模型，
+没有 GPU 时 Detector 和 yolov5_local/realtime_tsr.py 会优先加载它。校准图片默认取自 data/tsrd_dataset/images/train。
+
+检测线程的输入尺寸随视频宽高比和批大小变化，量化需要动态输入的 ONNX：默认由本脚本从 best_1.pt 导出到临时目录，
+不会覆盖 detector.py / int8_engine.py 使用的静态输入 best_1.onnx。
+
+用法：
+    python int8_onnx.py --images data/tsrd_dataset/images/train --num 100
+
+支持 VNNI 指令的 CPU 上 INT8 卷积明显快于 FP32；量化后需在验证集上确认 mAP 的下降在可接受范围内。
+"""
+import argparse
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import cv2
+import numpy as np
+import onnxruntime as ort
+from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_static
+
+from calib_images import collect_images
+from detector import INT8_ONNX_WEIGHTS, PT_WEIGHTS
+from utils.augmentations import letterbox
+
+
+class ImageDataReader(CalibrationDataReader):
+    """按检测线程相同的预处理（letterbox + RGB + CHW + /255）逐张提供校准输入"""
+
+    def __init__(self, image_paths, input_name, size=640):
+        self.input_name = input_name
+        self.size = size
+        self._paths = iter(image_paths)
+
+    def get_next(self):
+        path = next(self._paths, None)
+        if path is None:
+            return None
+        im = letterbox(cv2.imread(str(path)), self.size, auto=False)[0]
+        x = np.ascontiguousarray(im.transpose((2, 0, 1))[::-1], dtype=np.float32) / 255
+        return {self.input_name: x[None]}
+
+
+def export_dynamic_onnx(weights, tmp_dir, size=640):
+    """用 export.py 导出批大小和宽高都是动态的 ONNX；export.py 把结果写在权重旁边，所以先把权重复制到 tmp_dir"""
+    from export import run as export_run
+
+    src = Path(tmp_dir) / Path(weights).name
+    shutil.copy(weights, src)
+    files = export_run(weights=src, imgsz=(size, size), device="cpu", include=("onnx",), dynamic=True)
+    if not files:
+        raise SystemExit(f"导出动态输入的 ONNX 失败: {weights}")
+    return files[0]
+
+
+def build_int8_onnx(onnx_file, output_file, image_paths, size=640):
+    """以 QDQ 格式静态量化：激活 UINT8、权重按通道 INT8"""
+    session = ort.InferenceSession(str(onnx_file), providers=["CPUExecutionProvider"])
+    input_name = session.get_inputs()[0].name
+    del session
+
+    print(f"使用 {len(image_paths)} 张图片校准，输入尺寸 {size}，开始量化…")
+    quantize_static(
+        str(onnx_file),
+        str(output_file),
+        ImageDataReader(image_paths, input_name, size),
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        per_channel=True,
+    )
+    print(f"INT8 ONNX 模型已保存: {output_file}")
+    return output_file
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="构建 INT8 ONNX 模型（CPU 推理）")
+    parser.add_argument("--weights", default=str(PT_WEIGHTS), help="PyTorch 权重路径（未指定 --onnx 时从它导出）")
+    parser.add_argument("--onnx", default=None, help="已导出的动态输入 ONNX 模型路径")
+    parser.add_argument("--output", default=str(INT8_ONNX_WEIGHTS), help="输出模型路径")
+    parser.add_argument("--images", default=str(Path(__file__).parent / "data" / "tsrd_dataset" / "images" / "train"),
+                        help="校准图片目录")
+    parser.add_argument("--num", type=int, default=100, help="校准图片数量")
+    parser.add_argument("--imgsz", type=int, default=640, help="校准输入尺寸")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    images = collect_images(args.images, args.num)
+    if not images:
+        raise SystemExit(f"未找到校准图片: {args.images}")
+    if args.onnx is None:
+        with tempfile.TemporaryDirectory() as tmp:
+            build_int8_onnx(export_dynamic_onnx(args.weights, tmp, args.imgsz), args.output, images, args.imgsz)
+    elif not os.path.exists(args.onnx):
+        raise SystemExit(f"未找到 ONNX 模型: {args.onnx}")
+    else:
+        build_int8_onnx(args.onnx, args.output, images, args.imgsz)
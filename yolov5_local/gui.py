@@ -1,7 +1,9 @@
 import sys
-import cv2
 import os
-import subprocess
+import re
+import threading
+import cv2
+import numpy as np
 import traceback
 from pathlib import Path
 from PyQt5.QtWidgets import (
@@ -10,96 +12,229 @@ from PyQt5.QtWidgets import (
     QFileDialog, QStatusBar, QSizePolicy, QSlider,
     QAction, QProgressBar
 )
-from PyQt5.QtCore import Qt, QTimer, QTime, pyqtSignal, QThread
-from PyQt5.QtGui import QImage, QPixmap, QKeySequence, QFont
+from PyQt5.QtCore import Qt, QTimer, QTime, pyqtSignal, QThread, QElapsedTimer
+from PyQt5.QtGui import QImage, QPixmap, QKeySequence, QFont, QTextCursor
+
+
+# 视频显示区域与按钮的样式常量
+VIDEO_LABEL_STYLE = "border:2px dashed #999; background:#f5f5f5; color:#666;"
+VIDEO_LABEL_FONT_SIZE = 20
+BUTTON_MIN_HEIGHT = 40
+# Qt 5.14 起支持 QImage.Format_BGR888，可直接显示 OpenCV 的 BGR 帧
+HAS_BGR888 = hasattr(QImage, 'Format_BGR888')
+
+# 日志写入文本框的批量刷新间隔（毫秒）
+LOG_FLUSH_MS = 200
+# 日志文本框最多保留的行数
+LOG_MAX_BLOCKS = 2000
+
+# 拖动进度条时的跳转防抖间隔（毫秒）：只执行停顿后的最后一次跳转
+SEEK_DEBOUNCE_MS = 50
+
+# 进度条与时间标签的刷新间隔（毫秒）
+UI_REFRESH_MS = 100
+
+# 界面显示的目标帧率：源视频帧率更高时按整数步长抽帧，跳过的帧只 grab() 不 retrieve()
+DISPLAY_FPS = 30
+
+
+# 检测参数（与原先调用 detect.py 时的命令行参数一致）
+WEIGHTS = Path(__file__).parent / 'best_1.pt'
+IMG_SIZE = 416
+CONF_THRES = 0.25
+OUTPUT_DIR = Path('runs/detect')
+
+_model = None  # 进程内只加载一次的模型，多次处理视频时复用
+_model_lock = threading.Lock()  # 启动时的预加载线程与处理线程可能同时调用 load_model
+
+_EXP_RE = re.compile(r'exp(\d*)$')
+_last_exp_index = None  # 已用过的最大 expN 编号（exp 记为 1），首次创建输出目录时扫描一次得到
+
+
+def next_output_dir():
+    """
+    创建并返回新的输出目录 runs/detect/expN（命名规则与 yolov5 的 increment_path 一致）。
+    只在首次调用时用一次 os.scandir 读出已有编号，之后在内存中递增，
+    不再像 increment_path 那样从 exp2 起逐个 stat 历史目录。
+    """
+    global _last_exp_index
+    if _last_exp_index is None:
+        _last_exp_index = 0
+        if OUTPUT_DIR.is_dir():
+            with os.scandir(OUTPUT_DIR) as it:
+                for entry in it:
+                    m = _EXP_RE.match(entry.name)
+                    if m:
+                        _last_exp_index = max(_last_exp_index, int(m.group(1) or 1))
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    while True:
+        _last_exp_index += 1
+        path = OUTPUT_DIR / ('exp' if _last_exp_index == 1 else f'exp{_last_exp_index}')
+        try:
+            path.mkdir()  # 目录已被其他进程创建时继续递增
+            return path
+        except FileExistsError:
+            continue
+
+
+def load_model():
+    """通过本地 hubconf 加载 YOLOv5 模型（首次调用时加载，之后直接返回缓存的模型）"""
+    global _model
+    with _model_lock:
+        if _model is None:
+            import torch
+            device = 'cuda:0' if torch.cuda.is_available() else 'cpu'
+            model = torch.hub.load(str(Path(__file__).parent), 'custom', path=str(WEIGHTS), source='local',
+                                   device=device)
+            model.conf = CONF_THRES
+            if device != 'cpu':
+                # GPU 上以 FP16 推理（相当于 detect.py 的 --half），权重与激活的显存读写量减半；
+                # _prepare_input 按模型参数的类型分配输入张量，输入随之为 FP16
+                model.half()
+            _model = model
+    return _model
+
+
+class ModelLoadThread(QThread):
+    """界面启动后在后台预加载模型，用户选择第一个视频时无需再等待 torch 导入和权重加载"""
+    error = pyqtSignal(str)
+
+    def run(self):
+        try:
+            load_model()
+        except Exception:
+            traceback.print_exc()
+            self.error.emit("预加载模型失败，将在处理视频时重试。")
+
+
+def open_video(path):
+    """
+    打开视频文件：优先用 FFmpeg 后端的通用硬件解码（按视频编码自动选择 NVDEC/VAAPI/QSV 等），
+    不支持或打开失败时回退到默认的软件解码。
+    硬件解码通过本次打开的参数指定，不修改进程级环境变量，处理线程与播放同时打开视频也互不影响。
+    """
+    cap = None
+    if hasattr(cv2, 'CAP_PROP_HW_ACCELERATION'):
+        try:
+            cap = cv2.VideoCapture(path, cv2.CAP_FFMPEG,
+                                   [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY])
+        except cv2.error:
+            cap = None
+    if cap is None or not cap.isOpened():
+        cap = cv2.VideoCapture(path)
+    return cap
 
 
 class VideoProcessThread(QThread):
+    """
+    在进程内逐帧检测视频并写出带检测框的结果视频（runs/detect/expN/<视频名>.mp4）。
+    不再启动 detect.py 子进程：省去解释器启动和每次重新加载模型，进度直接按帧计数计算。
+    """
     progress = pyqtSignal(int)
     finished = pyqtSignal(str)
     error = pyqtSignal(str)
-    log = pyqtSignal(str)  # 用于将子进程输出传递到 GUI
+    log = pyqtSignal(str)  # 用于将处理日志传递到 GUI
 
-    def __init__(self, video_path, detect_script):
+    def __init__(self, video_path):
         super().__init__()
         self.video_path = video_path
-        self.detect_script = detect_script
+        self._in = None  # 预分配的模型输入张量 (1, 3, H, W)，位于模型所在设备
+        self._resize_buf = None  # 缩放后的 BGR 帧，cv2.resize 直接写入
+        self._roi = None  # 输入张量中有效图像区域的切片视图
+
+    def _prepare_input(self, model, h, w):
+        """
+        按视频尺寸一次性计算 letterbox 几何（与 AutoShape 相同）并分配输入缓冲区，
+        填充区预先写入 114/255，之后每帧只更新有效区域。
+        """
+        import torch
+        from utils.general import make_divisible
+
+        p = next(model.parameters())
+        g = IMG_SIZE / max(h, w)
+        inf_h, inf_w = (make_divisible(int(x * g), int(model.stride)) for x in (h, w))
+        r = min(inf_h / h, inf_w / w)
+        new_h, new_w = int(round(h * r)), int(round(w * r))
+        top = int(round((inf_h - new_h) / 2 - 0.1))
+        left = int(round((inf_w - new_w) / 2 - 0.1))
+
+        self._in = torch.full((1, 3, inf_h, inf_w), 114 / 255, dtype=p.dtype, device=p.device)
+        self._roi = self._in[0, :, top:top + new_h, left:left + new_w]
+        self._resize_buf = np.empty((new_h, new_w, 3), dtype=np.uint8)
+
+    def _frame_to_tensor(self, frame):
+        """缩放进复用的缓冲区后上传，在设备上完成 BGR→RGB、HWC→CHW、类型转换与归一化"""
+        import torch
+        h, w = self._resize_buf.shape[:2]
+        cv2.resize(frame, (w, h), dst=self._resize_buf, interpolation=cv2.INTER_LINEAR)
+        src = torch.from_numpy(self._resize_buf).to(self._in.device, non_blocking=True)
+        self._roi.copy_(src.permute(2, 0, 1).flip(0))
+        self._roi.mul_(1 / 255)
+        return self._in
 
     def run(self):
         try:
-            cmd = [
-                sys.executable, self.detect_script,
-                '--weights', 'best_1.pt',
-                '--source', self.video_path,
-                '--img', '416',
-                '--conf', '0.25',
-                '--device', 'cpu',
-                '--data', 'D:\\Project\\PyCharm\\Traffic_Sign_Recognition\\RealTime-TSR\\yolov5_local\\data\\tt100k.yaml'
-            ]
-
             self.log.emit(f"开始处理视频: {self.video_path}")
+            model = load_model()
 
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                encoding='utf-8',
-                errors='ignore',
-                bufsize=1
-            )
-
-            for line in process.stdout:
-                line = line.rstrip()
-                # 将子进程输出发给 GUI
-                self.log.emit(line)
-
-                # 解析进度信息
-                if 'video' in line and '/' in line:
-                    try:
-                        parts = line.split('(')[1].split(')')[0].split('/')
-                        current = int(parts[0])
-                        total = int(parts[1])
-                        progress = int((current / total) * 100)
-                        self.progress.emit(progress)
-                        if progress % 10 == 0:
-                            self.log.emit(f"处理进度: {progress}%")
-                    except Exception:
-                        pass
-
-            process.wait()
-
-            if process.returncode == 0:
-                video_name = Path(self.video_path).stem
-                output_dir = Path('runs/detect')
-
-                found = False
-                exp_dirs = list(output_dir.glob('exp*'))
-                if exp_dirs:
-                    latest_exp = max(exp_dirs, key=lambda x: x.stat().st_mtime)
-                    self.log.emit(f"使用最新的输出目录: {latest_exp}")
-
-                    for file in latest_exp.glob(f"{video_name}*.mp4"):
-                        self.log.emit(f"找到处理后的视频: {file}")
-                        self.finished.emit(str(file))
-                        found = True
-                        break
-                else:
-                    self.log.emit("未找到 exp 目录")
-
-                if not found:
-                    error_msg = (
-                        f"未找到处理后的视频文件。\n"
-                        f"视频名称: {video_name}\n"
-                        f"输出目录: {output_dir.absolute()}\n"
-                        f"已检查的 exp 目录: {[str(d) for d in exp_dirs]}"
-                    )
-                    self.log.emit(error_msg)
-                    self.error.emit(error_msg)
-            else:
-                err = f"视频处理脚本返回非零状态码: {process.returncode}"
+            cap = open_video(self.video_path)
+            if not cap.isOpened():
+                err = f"无法打开视频文件: {self.video_path}"
                 self.log.emit(err)
                 self.error.emit(err)
+                return
+
+            total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            fps = cap.get(cv2.CAP_PROP_FPS) or 30
+            w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+            import torch
+            # hubconf 加载后 yolov5 的 utils 已在 sys.path 中
+            from utils.general import non_max_suppression, scale_boxes
+            from utils.plots import Annotator, colors
+            save_dir = next_output_dir()
+            save_path = save_dir / f"{Path(self.video_path).stem}.mp4"
+            self.log.emit(f"输出目录: {save_dir}")
+            writer = cv2.VideoWriter(str(save_path), cv2.VideoWriter_fourcc(*"mp4v"), fps, (w, h))
+
+            # 直接把预处理好的张量交给模型，不再经过 AutoShape 每帧的 RGB 拷贝、letterbox、堆叠和 /255；
+            # 检测框直接画在原始 BGR 帧上，写入前也无需颜色转换
+            self._prepare_input(model, h, w)
+            names = model.names
+
+            count = 0
+            last_progress = -1
+            try:
+                while True:
+                    ret, frame = cap.read()
+                    if not ret:
+                        break
+                    x = self._frame_to_tensor(frame)
+                    with torch.inference_mode():
+                        pred = model(x)
+                        det = non_max_suppression(pred, model.conf, model.iou, max_det=model.max_det)[0]
+                        det[:, :4] = scale_boxes(x.shape[2:], det[:, :4], frame.shape).round()
+                    annotator = Annotator(frame, line_width=3, example=str(names))
+                    for *xyxy, conf, cls in reversed(det.tolist()):
+                        c = int(cls)
+                        annotator.box_label(xyxy, f"{names[c]} {conf:.2f}", color=colors(c, True))
+                    writer.write(annotator.result())
+
+                    count += 1
+                    if total > 0:
+                        progress = int(count / total * 100)
+                        if progress != last_progress:
+                            last_progress = progress
+                            self.progress.emit(progress)
+                            if progress % 10 == 0:
+                                self.log.emit(f"处理进度: {progress}%")
+            finally:
+                writer.release()
+                cap.release()
+
+            self.log.emit(f"共处理 {count} 帧，结果视频: {save_path}")
+            self.finished.emit(str(save_path))
 
         except Exception:
             traceback.print_exc()
@@ -114,15 +249,51 @@ class TrafficSignUI(QMainWindow):
         self.setWindowTitle("交通标志检测与识别")
         self.resize(1600, 900)
         self.camera = None
+        self._last_frame = None  # 最近一次显示的原始帧，截图直接保存它，不再从视频里多读一帧
         self.timer = QTimer()
         self.timer.timeout.connect(self._update_frame)
         self.total_frames = 0
         self.fps = 30
+        self.frame_stride = 1  # 每次显示前进的源视频帧数
+        self._interval_ms = 1000 / 30  # 显示周期，打开视频时按帧率和步长计算一次
+        self._paint_clock = QElapsedTimer()  # 距上一次显示的时间，用于漂移补偿
+        # 播放位置由本地计数维护，不再每帧查询 CAP_PROP_POS_FRAMES；总时长字符串只在打开时格式化一次
+        self._pos = 0
+        self._total_time_str = "00:00:00"
+        self._cur_sec = -1  # 时间标签上当前显示的秒数
+        # 跳转防抖：sliderMoved 只记录目标帧，定时器到期后才真正跳转
+        self._seek_target = None
+        self._seek_timer = QTimer()
+        self._seek_timer.setSingleShot(True)
+        self._seek_timer.setInterval(SEEK_DEBOUNCE_MS)
+        self._seek_timer.timeout.connect(self._apply_seek)
+        # 进度条与时间标签由低频定时器刷新，不再每显示一帧重绘一次
+        self._ui_timer = QTimer()
+        self._ui_timer.setInterval(UI_REFRESH_MS)
+        self._ui_timer.timeout.connect(self._refresh_slider)
         self.overlay_enabled = True
         self.processed_video_path = None
+        # 复用的 RGB 缓冲区及共享其内存的 QImage（不支持 Format_BGR888 时使用），只在分辨率变化时重新分配
+        self._rgb_buf = None
+        self._qimg = None
+        # 帧转 QImage 的方式只在启动时按 Qt 版本选一次，每帧不再判断
+        self._to_qimage = self._qimage_bgr888 if HAS_BGR888 else self._qimage_rgb
+        # 显示尺寸缓存（帧形状或标签尺寸变化时重新计算）与复用的缩放缓冲区
+        self._display_size = None
+        self._display_key = None
+        self._display_buf = None
+        # 视频区域的提示字体只创建一次，供 _setup_ui 使用
+        self._big_font = QFont()
+        self._big_font.setPointSize(VIDEO_LABEL_FONT_SIZE)
+
         self._setup_ui()
         self._create_actions()
 
+        # 后台预加载模型（处理线程会等待同一把锁，不会重复加载）
+        self.model_thread = ModelLoadThread()
+        self.model_thread.error.connect(self._append_log)
+        self.model_thread.start()
+
     def _setup_ui(self):
         central = QWidget()
         self.setCentralWidget(central)
@@ -139,10 +310,8 @@ class TrafficSignUI(QMainWindow):
         self.video_label = QLabel('请点击"打开视频"选择文件')
         self.video_label.setAlignment(Qt.AlignCenter)
         self.video_label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-        self.video_label.setStyleSheet("border:2px dashed #999; background:#f5f5f5; color:#666;")
-        font = QFont()
-        font.setPointSize(20)
-        self.video_label.setFont(font)
+        self.video_label.setStyleSheet(VIDEO_LABEL_STYLE)
+        self.video_label.setFont(self._big_font)
         v_layout.addWidget(self.video_label)
 
         # 进度条
@@ -172,7 +341,7 @@ class TrafficSignUI(QMainWindow):
         ]:
             btn = QPushButton(text)
             btn.setToolTip(tip)
-            btn.setMinimumHeight(40)
+            btn.setMinimumHeight(BUTTON_MIN_HEIGHT)
             btn.clicked.connect(slot)
             btns.addWidget(btn)
         v_layout.addLayout(btns)
@@ -189,7 +358,14 @@ class TrafficSignUI(QMainWindow):
         res_layout.addWidget(self.sign_img)
         self.info_text = QTextEdit()
         self.info_text.setReadOnly(True)
+        # 限制日志行数，文档不会随处理的视频数无限增长、拖慢重绘
+        self.info_text.document().setMaximumBlockCount(LOG_MAX_BLOCKS)
         res_layout.addWidget(self.info_text)
+        # 日志先进缓冲区，由定时器一次性写入，避免每行触发一次文档重排
+        self._log_buffer = []
+        self._log_flush_timer = QTimer()
+        self._log_flush_timer.timeout.connect(self._flush_log)
+        self._log_flush_timer.start(LOG_FLUSH_MS)
         tabs.addTab(result_tab, "检测结果")
 
         # 历史记录页
@@ -225,19 +401,17 @@ class TrafficSignUI(QMainWindow):
 
             # 清空“检测结果”文本框
             self.info_text.clear()
+            self._log_buffer.clear()
             self.statusBar().showMessage("正在处理视频...")
 
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            detect_script = os.path.join(current_dir, 'detect.py')
-
             self.progress_bar.setVisible(True)
             self.progress_bar.setValue(0)
 
-            self.process_thread = VideoProcessThread(path, detect_script)
+            self.process_thread = VideoProcessThread(path)
             self.process_thread.progress.connect(self._update_progress)
             self.process_thread.finished.connect(self._on_processing_finished)
             self.process_thread.error.connect(self._on_processing_error)
-            # 连接 log 信号，把子进程输出追加到 info_text
+            # 连接 log 信号，把处理日志追加到 info_text
             self.process_thread.log.connect(self._append_log)
             self.process_thread.start()
         except Exception:
@@ -245,8 +419,21 @@ class TrafficSignUI(QMainWindow):
             self.statusBar().showMessage("打开视频时出现异常，请查看控制台。")
 
     def _append_log(self, text):
-        """将子进程输出追加到“检测结果”QTextEdit中"""
-        self.info_text.append(text)
+        """将处理日志放入缓冲，由 _flush_log 批量追加到“检测结果”QTextEdit中"""
+        self._log_buffer.append(text)
+
+    def _flush_log(self):
+        """把缓冲的日志用一次 insertText 追加到文本框末尾，并滚动到底部"""
+        if not self._log_buffer:
+            return
+        doc = self.info_text.document()
+        cursor = QTextCursor(doc)
+        cursor.movePosition(QTextCursor.End)
+        if not doc.isEmpty():
+            cursor.insertBlock()
+        cursor.insertText("\n".join(self._log_buffer))
+        self._log_buffer.clear()
+        self.info_text.moveCursor(QTextCursor.End)
 
     def _update_progress(self, value):
         self.progress_bar.setValue(value)
@@ -257,31 +444,39 @@ class TrafficSignUI(QMainWindow):
         self.processed_video_path = output_path
 
         try:
-            if self.camera:
-                self.camera.release()
-            self.camera = cv2.VideoCapture(self.processed_video_path)
-            if not self.camera.isOpened():
+            # 复用同一个 VideoCapture 对象，open() 会先关闭上一个视频再打开新的
+            if self.camera is None:
+                self.camera = cv2.VideoCapture()
+            self._last_frame = None
+            if not self.camera.open(self.processed_video_path):
                 err_msg = "无法打开处理后的视频"
-                self.info_text.append(err_msg)
+                self._append_log(err_msg)
                 self.statusBar().showMessage(err_msg)
                 return
 
             self.total_frames = int(self.camera.get(cv2.CAP_PROP_FRAME_COUNT))
             self.fps = self.camera.get(cv2.CAP_PROP_FPS) or 30
+            self.frame_stride = max(1, round(self.fps / self._display_fps()))
+            self._interval_ms = 1000 * self.frame_stride / self.fps
             self.slider.setMaximum(self.total_frames)
             self.slider.setEnabled(True)
             dur = QTime(0, 0, 0).addMSecs(int(self.total_frames / self.fps * 1000))
-            self.time_label.setText(f"00:00:00 / {dur.toString('hh:mm:ss')}")
+            self._total_time_str = dur.toString('hh:mm:ss')
+            self._pos = 0
+            self._cur_sec = -1
+            self.time_label.setText(f"00:00:00 / {self._total_time_str}")
+            self._ui_timer.start()
             self.statusBar().showMessage("视频处理完成")
 
-            self.timer.start(int(1000 / self.fps))
+            self._paint_clock.invalidate()
+            self.timer.start(int(self._interval_ms))
             self.statusBar().showMessage("正在播放...")
         except Exception:
             traceback.print_exc()
             self.statusBar().showMessage("打开处理后的视频时出现异常，请查看控制台。")
 
     def _on_processing_error(self, error_msg):
-        self.info_text.append(f"错误: {error_msg}")
+        self._append_log(f"错误: {error_msg}")
         self.progress_bar.setVisible(False)
         self.statusBar().showMessage(f"处理视频时出错: {error_msg}")
 
@@ -293,28 +488,38 @@ class TrafficSignUI(QMainWindow):
                 self.timer.stop()
                 self.statusBar().showMessage("已暂停")
             else:
-                self.timer.start(int(1000 / self.fps))
+                self._paint_clock.invalidate()
+                self.timer.start(int(self._interval_ms))
                 self.statusBar().showMessage("播放中...")
         except Exception:
             traceback.print_exc()
             self.statusBar().showMessage("播放切换时出现异常，请查看控制台。")
 
     def _seek_frame(self, f):
+        """拖动进度条时只记录目标帧并重启防抖定时器，连续拖动只触发一次实际跳转"""
+        if not self.camera:
+            return
+        self._seek_target = f
+        self._seek_timer.start()
+
+    def _apply_seek(self):
         try:
-            if not self.camera:
+            if not self.camera or self._seek_target is None:
                 return
-            self.camera.set(cv2.CAP_PROP_POS_FRAMES, f)
+            # 按时间跳转，FFmpeg 后端落到附近位置即可，不必像按帧号那样精确定位
+            self.camera.set(cv2.CAP_PROP_POS_MSEC, self._seek_target * 1000.0 / self.fps)
+            self._pos = int(self.camera.get(cv2.CAP_PROP_POS_FRAMES))
+            self._seek_target = None
+            self._paint_clock.invalidate()  # 跳转本身的耗时不计入落后
         except Exception:
             traceback.print_exc()
             self.statusBar().showMessage("跳转帧时出现异常，请查看控制台。")
 
     def _save_frame(self):
         try:
-            if not self.camera:
-                return
-            ret, frame = self.camera.read()
-            if not ret:
+            if self._last_frame is None:
                 return
+            frame = self._last_frame
             p, _ = QFileDialog.getSaveFileName(self, "保存图片", "", "PNG (*.png)")
             if p:
                 cv2.imwrite(p, frame)
@@ -323,34 +528,112 @@ class TrafficSignUI(QMainWindow):
             traceback.print_exc()
             self.statusBar().showMessage("保存截图时出现异常，请查看控制台。")
 
+    def _grab_frame(self):
+        """
+        按 frame_stride 抽帧：先用 grab() 跳过 frame_stride - 1 帧（只解码、不转换成 BGR、不拷贝），
+        再 grab() + retrieve() 取出真正要显示的一帧。返回值与 read() 相同。
+        """
+        for _ in range(self.frame_stride - 1):
+            if not self._grab():
+                return False, None
+        if not self._grab():
+            return False, None
+        return self.camera.retrieve()
+
+    def _grab(self):
+        """grab() 一帧并维护本地播放位置"""
+        ok = self.camera.grab()
+        if ok:
+            self._pos += 1
+        return ok
+
+    def _display_fps(self):
+        """显示帧率上限：DISPLAY_FPS 与窗口所在屏幕刷新率中的较小值，超过刷新率的帧画出来也看不到"""
+        handle = self.windowHandle()
+        screen = handle.screen() if handle else QApplication.primaryScreen()
+        refresh = screen.refreshRate() if screen else 0
+        return min(DISPLAY_FPS, refresh) if refresh > 0 else DISPLAY_FPS
+
+    def _catch_up(self):
+        """
+        漂移补偿：GUI 线程被阻塞导致定时器晚触发时，按落后的显示周期数额外 grab() 跳过相应的帧，
+        播放进度与实际时间保持一致，而不是把落后的帧逐一补画出来。
+        """
+        if self._paint_clock.isValid():
+            behind = int(self._paint_clock.elapsed() / self._interval_ms) - 1
+            for _ in range(behind * self.frame_stride):
+                if not self._grab():
+                    break
+        self._paint_clock.start()
+
     def _update_frame(self):
         try:
-            ret, frame = self.camera.read()
+            self._catch_up()
+            ret, frame = self._grab_frame()
             if not ret:
                 self.timer.stop()
                 self.statusBar().showMessage("播放结束")
                 return
+            # retrieve() 每次返回新数组，缩放和颜色转换都写入各自的复用缓冲区，不会改动 frame，直接保留引用即可
+            self._last_frame = frame
 
-            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            h, w, _ = rgb.shape
-            img = QImage(rgb.data, w, h, 3 * w, QImage.Format_RGB888)
-            pix = QPixmap.fromImage(img)
-            self.video_label.setPixmap(pix)
-
-            pos = int(self.camera.get(cv2.CAP_PROP_POS_FRAMES))
-            self.slider.blockSignals(True)
-            self.slider.setValue(pos)
-            self.slider.blockSignals(False)
-
-            cur = QTime(0, 0, 0).addMSecs(int(pos / self.fps * 1000))
-            tot = QTime(0, 0, 0).addMSecs(int(self.total_frames / self.fps * 1000))
-            self.time_label.setText(f"{cur.toString('hh:mm:ss')} / {tot.toString('hh:mm:ss')}")
+            img = self._to_qimage(self._fit_to_label(frame))
+            self.video_label.setPixmap(QPixmap.fromImage(img))
 
         except Exception:
             traceback.print_exc()
             self.timer.stop()
             self.statusBar().showMessage("播放时出错，请查看控制台。")
 
+    def _refresh_slider(self):
+        """按 UI_REFRESH_MS 把 _update_frame 维护的播放位置同步到进度条和时间标签"""
+        if self.slider.isSliderDown():
+            return  # 拖动中不回写，避免滑块被拉回当前播放位置
+        if self.slider.value() != self._pos:
+            self.slider.blockSignals(True)
+            self.slider.setValue(self._pos)
+            self.slider.blockSignals(False)
+
+        # 只有显示的秒数变化时才重新格式化时间标签
+        cur_sec = int(self._pos / self.fps)
+        if cur_sec != self._cur_sec:
+            self._cur_sec = cur_sec
+            cur = QTime(0, 0, 0).addSecs(cur_sec)
+            self.time_label.setText(f"{cur.toString('hh:mm:ss')} / {self._total_time_str}")
+
+    def _qimage_bgr888(self, frame):
+        """Qt 5.14+ 直接显示 BGR 数据，省去整帧 cvtColor"""
+        h, w = frame.shape[:2]
+        return QImage(frame.data, w, h, frame.strides[0], QImage.Format_BGR888)
+
+    def _qimage_rgb(self, frame):
+        """转换到复用的 RGB 缓冲区，QImage 与其共享内存，只剩 QPixmap.fromImage 一次拷贝"""
+        if self._rgb_buf is None or self._rgb_buf.shape != frame.shape:
+            h, w = frame.shape[:2]
+            self._rgb_buf = np.empty((h, w, 3), np.uint8)
+            self._qimg = QImage(self._rgb_buf.data, w, h, 3 * w, QImage.Format_RGB888)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb_buf)
+        return self._qimg
+
+    def _fit_to_label(self, frame):
+        """
+        按 QLabel 尺寸等比缩小帧（INTER_AREA，写入复用缓冲区），之后的颜色转换与 QPixmap 上传只处理显示尺寸的像素。
+        帧本身不大于显示区域时原样返回。
+        """
+        # 拖动 QSplitter 分隔条只改变标签尺寸、不经过窗口的 resizeEvent，因此标签尺寸也是缓存键的一部分
+        key = (frame.shape, self.video_label.width(), self.video_label.height())
+        if key != self._display_key:
+            h, w = frame.shape[:2]
+            scale = min(self.video_label.width() / w, self.video_label.height() / h, 1.0)
+            self._display_size = (max(1, int(w * scale)), max(1, int(h * scale)))
+            self._display_key = key
+        size = self._display_size
+        if (frame.shape[1], frame.shape[0]) == size:
+            return frame
+        if self._display_buf is None or self._display_buf.shape[:2] != (size[1], size[0]):
+            self._display_buf = np.empty((size[1], size[0], 3), np.uint8)
+        return cv2.resize(frame, size, dst=self._display_buf, interpolation=cv2.INTER_AREA)
+
     def _toggle_overlay(self):
         try:
             self.overlay_enabled = not self.overlay_enabled
@@ -1,50 +1,788 @@
 import sys
 import os
+import importlib.util
+import re
+import shutil
+import tempfile
 import cv2
-import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import torch
 import traceback
 import numpy as np
 from pathlib import Path
-from skimage import exposure  # 用于直方图均衡化
 import time
 
+try:
+    from numba import njit, prange  # 可选：装了 numba 时 CPU 上的 CLAHE 改用 JIT 并行实现
+except ImportError:
+    njit = None
+
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QLabel, QPushButton, QSplitter,
     QVBoxLayout, QHBoxLayout, QTabWidget, QTextEdit, QListWidget,
     QFileDialog, QStatusBar, QSizePolicy, QSlider, QAction, QProgressBar, QMessageBox,
-    QComboBox, QCheckBox, QGroupBox  # 添加QCheckBox和QGroupBox
+    QComboBox, QCheckBox, QGroupBox,  # 添加QCheckBox和QGroupBox
+    QOpenGLWidget
 )
-from PyQt5.QtCore import Qt, QTimer, QTime, pyqtSignal, QThread
-from PyQt5.QtGui import QImage, QPixmap, QKeySequence, QFont
+from PyQt5.QtCore import Qt, QTimer, QTime, pyqtSignal, QThread, QRect
+from PyQt5.QtGui import QImage, QKeySequence, QFont, QPainter, QPen, QColor
+
+
+# Qt 5.14 起支持 QImage.Format_BGR888，可直接显示 OpenCV 的 BGR 帧
+HAS_BGR888 = hasattr(QImage, 'Format_BGR888')
+
+# 界面显示的目标帧率：源视频帧率更高时按整数步长抽帧，跳过的帧只 grab() 不 retrieve()
+DISPLAY_FPS = 30
+
+# OpenCV 编译了 CUDA 模块且有可用 GPU 时，预处理（CLAHE、锐化等）改在 GPU 上用 cv2.cuda 完成
+HAS_CV2_CUDA = hasattr(cv2, 'cuda') and cv2.cuda.getCudaEnabledDeviceCount() > 0
+
+# 锐化卷积核：模块加载时按 filter2D 内部使用的 float32 建好，预处理时不再逐帧构造数组
+SHARPEN_KERNEL = np.array([[-1, -1, -1],
+                           [-1,  9, -1],
+                           [-1, -1, -1]], dtype=np.float32)
+
+# 送去检测的帧的最长边：主线程放入最新帧槽前先缩小到网络输入尺寸，不再把整幅原始分辨率帧交给检测线程
+DETECT_SIZE = 640
+
+# 送去检测的默认帧率：与显示帧率解耦，按时间间隔抽样送去检测，界面上可用滑块调整（1~30）
+INFER_FPS = 15
+
+# 检测结果文本框的刷新间隔（毫秒）：检测线程每帧发来的结果只保留最新一份，最多约 5 次/秒重建文本框
+LOG_REFRESH_MS = 200
+
+# 检测线程一次最多合并推理的帧数（也是最新帧槽的容量，槽中积攒的帧一起做一次前向）
+BATCH_MAX = 4
+
+
+# 没有 GPU 时优先使用的 INT8 静态量化 ONNX 模型（由仓库根目录的 int8_onnx.py 生成），需要 onnxruntime
+INT8_ONNX_WEIGHTS = Path(__file__).parent / 'best_1.int8.onnx'
+
+# TensorRT 引擎的缓存目录：引擎与显卡型号、CUDA 和 TensorRT 版本绑定，按三者组合命名，换环境后自动重新构建
+ENGINE_CACHE_DIR = Path(__file__).parent / 'runs' / 'engine'
+
+# TorchScript 追踪结果的磁盘缓存目录：同一权重、输入形状、精度和设备只追踪一次，之后直接加载
+JIT_CACHE_DIR = Path(__file__).parent / 'runs' / 'jit'
+
+
+class _TracedModel(torch.nn.Module):
+    """
+    按输入形状（及精度、设备）缓存 torch.jit.trace 的结果，消除逐算子的 Python 调度开销。
+    同一视频的输入形状固定，批大小最多 BATCH_MAX 种，各追踪一次并保存到 JIT_CACHE_DIR；
+    追踪失败时回退到原始 eager 模型。它替换的是 DetectMultiBackend.model（DetectionModel），
+    AutoShape._apply 通过 self.model.model.model[-1] 找 Detect 层，所以 .model 属性转给 eager 模型的层序列。
+    """
+
+    def __init__(self, model, weights):
+        super().__init__()
+        self.eager = model
+        self._traced = {}
+        self._tag = f"{Path(weights).stem}_{int(os.path.getmtime(weights))}"  # 权重更新后旧缓存自动失效
+
+    @property
+    def model(self):
+        """eager DetectionModel 的层序列（nn.Sequential），供 AutoShape._apply 取 Detect 层"""
+        return self.eager.model
+
+    def forward(self, x, *args, **kwargs):
+        if args or kwargs:
+            return self.eager(x, *args, **kwargs)
+        key = (tuple(x.shape), x.dtype, x.device)
+        traced = self._traced.get(key)
+        if traced is None:
+            traced = self._load_or_trace(x)
+            self._traced[key] = traced
+        return traced(x)
+
+    def _load_or_trace(self, x):
+        shape = "x".join(str(d) for d in x.shape)
+        path = JIT_CACHE_DIR / f"{self._tag}_{shape}_{str(x.dtype).split('.')[-1]}_{x.device.type}.torchscript"
+        try:
+            if path.exists():
+                return torch.jit.load(str(path), map_location=x.device)
+            traced = torch.jit.trace(self.eager, x, strict=False, check_trace=False)
+            JIT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            traced.save(str(path))
+            return traced
+        except Exception as e:
+            print("检测线程：TorchScript 追踪失败，使用 eager 模式:", e)
+            return self.eager
+
+
+def _build_fp16_engine(onnx_file, engine_file, workspace=4):
+    """
+    按 int8_engine.py 的方式解析动态输入的 ONNX 并构建 FP16 引擎。优化配置覆盖检测线程可能送入的所有形状：
+    批大小 1~BATCH_MAX、宽高为 32 的倍数且不超过 DETECT_SIZE，默认按 16:9 横屏视频的单帧输入（384x640）调优。
+    """
+    import tensorrt as trt
+
+    logger = trt.Logger(trt.Logger.INFO)
+    builder = trt.Builder(logger)
+    config = builder.create_builder_config()
+    if int(trt.__version__.split(".")[0]) >= 10:
+        config.set_memory_pool_limit(trt.MemoryPoolType.WORKSPACE, workspace << 30)
+    else:
+        config.max_workspace_size = workspace << 30
+
+    network = builder.create_network(1 << int(trt.NetworkDefinitionCreationFlag.EXPLICIT_BATCH))
+    parser = trt.OnnxParser(network, logger)
+    if not parser.parse_from_file(str(onnx_file)):
+        raise RuntimeError(f"解析 ONNX 文件失败: {onnx_file}")
+
+    profile = builder.create_optimization_profile()
+    profile.set_shape(network.get_input(0).name, (1, 3, 32, 32), (1, 3, 384, DETECT_SIZE),
+                      (BATCH_MAX, 3, DETECT_SIZE, DETECT_SIZE))
+    config.add_optimization_profile(profile)
+    if builder.platform_has_fast_fp16:
+        config.set_flag(trt.BuilderFlag.FP16)
+
+    engine = builder.build_serialized_network(network, config)
+    if engine is None:
+        raise RuntimeError("构建 FP16 引擎失败")
+    ENGINE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    with open(engine_file, "wb") as f:
+        f.write(engine)
+
+
+def _trt_engine(weights, device):
+    """
+    返回当前 (显卡, CUDA, TensorRT) 组合对应的 FP16 TensorRT 引擎，缓存中没有时从 weights 构建一次。
+    export.py 不允许 --half 与 --dynamic 同时使用，因此只用它导出动态输入的 ONNX，再由 _build_fp16_engine 构建引擎；
+    ONNX 写在临时目录里，不会覆盖 detector.py 使用的 best_1.onnx。
+    构建失败时返回 None，由调用方回退到 PyTorch 权重。
+    """
+    import tensorrt as trt
+
+    index = torch.device(device).index or 0
+    gpu = re.sub(r'\W+', '_', torch.cuda.get_device_name(index))
+    engine = ENGINE_CACHE_DIR / (f"{weights.stem}_{gpu}_cuda{torch.version.cuda}"
+                                 f"_trt{trt.__version__}_b{BATCH_MAX}.engine")
+    if engine.exists():
+        return engine
+
+    print(f"检测线程：未找到 TensorRT 引擎，开始构建（仅首次需要，可能耗时数分钟）：{engine.name}")
+    try:
+        from export import run as export_run
+        with tempfile.TemporaryDirectory() as tmp:
+            # export.py 把 ONNX 写在权重旁边，先把权重复制到临时目录
+            src = Path(tmp) / weights.name
+            shutil.copy(weights, src)
+            files = export_run(weights=src, imgsz=(DETECT_SIZE, DETECT_SIZE), device='cpu',
+                               include=('onnx',), dynamic=True)
+            if not files:
+                raise RuntimeError("导出 ONNX 失败")
+            _build_fp16_engine(files[0], engine)
+        return engine
+    except Exception as e:
+        print("检测线程：TensorRT 引擎构建失败，使用 PyTorch 权重:", e)
+        return None
+
+
+_MODEL = None  # 进程内只加载一次的模型，每次打开视频新建的检测线程都复用它
+_MODEL_LOCK = threading.Lock()
+
+
+def _get_model(device):
+    """
+    首次调用时通过本地 hubconf 加载模型并完成推理相关设置，之后直接返回缓存的模型，
+    不再每次打开视频都重新导入 yolov5 模块、反序列化权重。
+    """
+    global _MODEL
+    with _MODEL_LOCK:
+        if _MODEL is None:
+            # 1) 获取脚本所在目录（假设本脚本位于 yolov5_local 根目录）
+            repo_dir = Path(__file__).parent.resolve()
+
+            # 2) 模型文件 best.pt 也在同一目录；GPU 上装了 TensorRT 时改用（必要时现场构建的）FP16 引擎，
+            #    CPU 上有 INT8 ONNX 模型且装了 onnxruntime 时改用它
+            model_path = repo_dir / "best_1.pt"
+            if not model_path.exists():
+                raise FileNotFoundError(f"找不到模型文件：{model_path}")
+            if device.startswith('cuda') and importlib.util.find_spec('tensorrt') is not None:
+                model_path = _trt_engine(model_path, device) or model_path
+            elif (device == 'cpu' and INT8_ONNX_WEIGHTS.exists()
+                    and importlib.util.find_spec('onnxruntime') is not None):
+                model_path = INT8_ONNX_WEIGHTS
+
+            # CPU 推理只用一半核心、算子间不并行，给 Qt 界面线程和 OpenCV 解码留出 CPU
+            torch.set_num_threads(max(1, (os.cpu_count() or 2) // 2))
+            torch.set_num_interop_threads(1)
+            torch.backends.mkldnn.enabled = True
+
+            # 3) 调用 torch.hub.load 加载本地仓库（由 repo_dir 提供）
+            #    source='local' 保证直接读取本地 hubconf.py
+            model = torch.hub.load(
+                str(repo_dir),
+                'custom',
+                path=str(model_path),
+                source='local',
+                device=device
+            )
+            model.eval()
+            if model_path.suffix == '.engine':
+                # TensorRT 引擎不带类别元数据（只会得到 class0、class1…），类别名称从构建引擎所用的 PyTorch 权重中读取
+                ckpt = torch.load(str(repo_dir / "best_1.pt"), map_location='cpu')
+                names = (ckpt.get('ema') or ckpt['model']).names
+                model.names = model.model.names = dict(enumerate(names)) if isinstance(names, (list, tuple)) else names
+            if model.pt:
+                # AutoShape → DetectMultiBackend → DetectionModel：替换最内层网络，首次推理时按实际输入形状追踪
+                model.model.model = _TracedModel(model.model.model, model_path)
+
+            # 优化模型参数，特别是NMS相关的阈值
+            model.conf = 0.25  # 降低置信度阈值，提高召回率
+            model.iou = 0.45   # 降低IOU阈值，减少重复检测
+            model.max_det = 100  # 限制最大检测数量
+            model.agnostic = True  # 类别无关的NMS
+            model.multi_label = True  # 允许多标签检测
+            _MODEL = model
+
+        model = _MODEL.to(device)
+        if device.startswith('cuda') and model.pt:
+            model.half()  # GPU 上以 FP16 推理，_prepare_input 按参数类型分配输入张量
+            torch.backends.cudnn.benchmark = True  # 同一视频输入形状固定，让 cuDNN 为其挑选最快的卷积算法
+        return model
+
+
+def batched_nms(pred, conf_thres, iou_thres, agnostic=False, multi_label=False, max_det=300):
+    """
+    与 utils.general.non_max_suppression 的筛选规则一致（obj 置信度预筛、obj×cls 得分、multi_label / agnostic），
+    但整批候选框只调用一次 torchvision.ops.batched_nms：按 (图像, 类别) 分组，全部在模型所在设备上完成，
+    不再逐张图像循环。返回每张图像一个 (n, 6) 张量 [x1, y1, x2, y2, conf, cls]，按得分从高到低排列。
+    """
+    import torchvision
+    from utils.general import xywh2xyxy
+
+    if isinstance(pred, (list, tuple)):
+        pred = pred[0]  # 推理输出为 (预测, 各层特征)
+    bs, nc = pred.shape[0], pred.shape[2] - 5
+
+    img, anchor = (pred[..., 4] > conf_thres).nonzero(as_tuple=True)
+    x = pred[img, anchor].float()
+    scores = x[:, 5:] * x[:, 4:5]  # conf = obj_conf * cls_conf
+    boxes = xywh2xyxy(x[:, :4])
+    if multi_label:
+        i, cls = (scores > conf_thres).nonzero(as_tuple=True)
+        img, boxes, conf = img[i], boxes[i], scores[i, cls]
+    else:
+        conf, cls = scores.max(1)
+        keep = conf > conf_thres
+        img, boxes, conf, cls = img[keep], boxes[keep], conf[keep], cls[keep]
+
+    groups = img if agnostic else img * nc + cls
+    keep = torchvision.ops.batched_nms(boxes, conf, groups, iou_thres)
+    det = torch.cat((boxes, conf[:, None], cls[:, None].float()), 1)[keep]
+    img = img[keep]
+    return [det[img == b][:max_det] for b in range(bs)]
+
+
+def fit_size(w, h, view_w, view_h):
+    """等比缩小 (w, h) 以放进 (view_w, view_h)，不放大"""
+    scale = min(view_w / w, view_h / h, 1.0)
+    return max(1, int(w * scale)), max(1, int(h * scale))
+
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _tile_histograms(src, tiles_y, tiles_x, tile_h, tile_w):
+        """按瓦片统计亮度直方图（src 已填充到瓦片尺寸的整数倍），瓦片之间并行"""
+        hist = np.zeros((tiles_y * tiles_x, 256), np.int32)
+        for t in prange(tiles_y * tiles_x):
+            ty, tx = t // tiles_x, t % tiles_x
+            for r in range(ty * tile_h, (ty + 1) * tile_h):
+                for c in range(tx * tile_w, (tx + 1) * tile_w):
+                    hist[t, src[r, c]] += 1
+        return hist
+
+    @njit(parallel=True, cache=True)
+    def _clip_to_luts(hist, clip, lut_scale):
+        """
+        与 OpenCV 相同：截断到 clip 后把超出部分均分给 256 个灰度级，余数按 256 // 余数 的步长逐个补 1，
+        再累加成映射表（float32 计算、四舍六入五成双）
+        """
+        luts = np.empty(hist.shape, np.uint8)
+        for t in prange(hist.shape[0]):
+            clipped = 0
+            for v in range(256):
+                if hist[t, v] > clip:
+                    clipped += hist[t, v] - clip
+                    hist[t, v] = clip
+            batch, residual = clipped // 256, clipped % 256
+            for v in range(256):
+                hist[t, v] += batch
+            if residual:
+                step = max(256 // residual, 1)
+                v = 0
+                while v < 256 and residual > 0:
+                    hist[t, v] += 1
+                    v += step
+                    residual -= 1
+            cdf = 0
+            for v in range(256):
+                cdf += hist[t, v]
+                luts[t, v] = min(255, int(np.rint(np.float32(cdf) * lut_scale)))
+        return luts
+
+    @njit(parallel=True, cache=True)
+    def _interpolate_luts(y_plane, luts, tiles_y, tiles_x, tile_h, tile_w):
+        """按 OpenCV 的采样位置（x / tile_w - 0.5）在相邻四个瓦片的映射结果之间双线性插值，按行并行"""
+        h, w = y_plane.shape
+        out = np.empty_like(y_plane)
+        inv_tw, inv_th = np.float32(1.0) / np.float32(tile_w), np.float32(1.0) / np.float32(tile_h)
+        x_lo, x_hi = np.empty(w, np.int64), np.empty(w, np.int64)
+        x_wt = np.empty(w, np.float32)
+        for c in range(w):
+            fx = np.float32(c) * inv_tw - np.float32(0.5)
+            x0 = int(np.floor(fx))
+            x_wt[c] = fx - np.float32(x0)
+            x_lo[c], x_hi[c] = max(x0, 0), min(x0 + 1, tiles_x - 1)
+        for r in prange(h):
+            fy = np.float32(r) * inv_th - np.float32(0.5)
+            y0 = int(np.floor(fy))
+            wy = fy - np.float32(y0)
+            y1, y0 = min(y0 + 1, tiles_y - 1), max(y0, 0)
+            for c in range(w):
+                v = y_plane[r, c]
+                wx = x_wt[c]
+                top = (np.float32(luts[y0 * tiles_x + x_lo[c], v]) * (np.float32(1.0) - wx)
+                       + np.float32(luts[y0 * tiles_x + x_hi[c], v]) * wx)
+                bottom = (np.float32(luts[y1 * tiles_x + x_lo[c], v]) * (np.float32(1.0) - wx)
+                          + np.float32(luts[y1 * tiles_x + x_hi[c], v]) * wx)
+                out[r, c] = min(255, int(np.rint(top * (np.float32(1.0) - wy) + bottom * wy)))
+        return out
+
+
+def clahe_numba(y_plane, clip_limit=1.5, tiles=(8, 8)):
+    """
+    numba 实现的 CLAHE，直接作用于单通道亮度平面（uint8），返回新数组。
+    瓦片划分、reflect-101 填充、截断余数的分配、插值位置和 float32 舍入都按 OpenCV 的 CLAHE 实现，
+    输出与 cv2.createCLAHE(clip_limit, (tiles[1], tiles[0])).apply 逐像素一致（tiles 为 (行数, 列数)）。
+    """
+    y_plane = np.ascontiguousarray(y_plane)
+    h, w = y_plane.shape
+    tiles_y, tiles_x = tiles
+    src = y_plane
+    if h % tiles_y or w % tiles_x:
+        # 与 OpenCV 一致：尺寸不是瓦片数的整数倍时在下方和右侧按 reflect-101 补齐（整除的方向也补一整组）
+        src = cv2.copyMakeBorder(y_plane, 0, tiles_y - h % tiles_y, 0, tiles_x - w % tiles_x, cv2.BORDER_REFLECT_101)
+    tile_h, tile_w = src.shape[0] // tiles_y, src.shape[1] // tiles_x
+    area = tile_h * tile_w
+    clip = max(int(clip_limit * area / 256), 1) if clip_limit > 0 else 1 << 30
+    hist = _tile_histograms(src, tiles_y, tiles_x, tile_h, tile_w)
+    luts = _clip_to_luts(hist, clip, np.float32(255) / np.float32(area))
+    return _interpolate_luts(y_plane, luts, tiles_y, tiles_x, tile_h, tile_w)
+
+
+class CudaPreprocessor:
+    """
+    _preprocess_frame 的 cv2.cuda 版本：所有操作串在同一个 cv2.cuda.Stream 上异步执行，最后下载一次。
+    CUDA 的线性滤波只支持 1/4 通道、中值滤波只支持单通道，锐化转成 BGRA 做，降噪按通道分别做。
+    """
+
+    def __init__(self):
+        self.stream = cv2.cuda.Stream()
+        self._src = cv2.cuda_GpuMat()
+        self._clahe = cv2.cuda.createCLAHE(clipLimit=1.5, tileGridSize=(8, 8))
+        self._sharpen = cv2.cuda.createLinearFilter(cv2.CV_8UC4, cv2.CV_8UC4, SHARPEN_KERNEL)
+        self._median = cv2.cuda.createMedianFilter(cv2.CV_8UC1, 3)
+
+    def process(self, frame, methods, on_error):
+        """上传 frame，依次应用 methods 后下载；单个方法失败时回调 on_error 并跳过"""
+        stream = self.stream
+        self._src.upload(frame, stream)
+        small = self._src
+
+        for method in methods:
+            try:
+                if method == 'clahe':
+                    lab = cv2.cuda.cvtColor(small, cv2.COLOR_BGR2LAB, stream=stream)
+                    l, a, b = cv2.cuda.split(lab, stream=stream)
+                    l = self._clahe.apply(l, stream)
+                    small = cv2.cuda.cvtColor(cv2.cuda.merge([l, a, b], stream=stream),
+                                              cv2.COLOR_LAB2BGR, stream=stream)
+
+                elif method == 'histeq':
+                    ycrcb = cv2.cuda.cvtColor(small, cv2.COLOR_BGR2YCrCb, stream=stream)
+                    y, cr, cb = cv2.cuda.split(ycrcb, stream=stream)
+                    y = cv2.cuda.equalizeHist(y, stream=stream)
+                    small = cv2.cuda.cvtColor(cv2.cuda.merge([y, cr, cb], stream=stream),
+                                              cv2.COLOR_YCrCb2BGR, stream=stream)
+
+                elif method == 'sharpen':
+                    bgra = cv2.cuda.cvtColor(small, cv2.COLOR_BGR2BGRA, stream=stream)
+                    bgra = self._sharpen.apply(bgra, stream=stream)
+                    small = cv2.cuda.cvtColor(bgra, cv2.COLOR_BGRA2BGR, stream=stream)
+
+                elif method == 'denoise':
+                    channels = [self._median.apply(c, stream=stream)
+                                for c in cv2.cuda.split(small, stream=stream)]
+                    small = cv2.cuda.merge(channels, stream=stream)
+
+                elif method == 'contrast':
+                    # 与 convertScaleAbs(alpha=1.1, beta=10) 一致：结果非负，饱和截断到 uint8
+                    small = small.convertTo(cv2.CV_8UC3, 1.1, 10, stream)
+
+            except cv2.error as e:
+                on_error(f"预处理方法 {method} 执行失败: {str(e)}")
+                continue
+
+        result = small.download(stream)
+        stream.waitForCompletion()
+        return result
+
+
+class DisplayImage:
+    """
+    在工作线程里把 BGR 帧等比缩小到显示尺寸（cv2.resize 写入复用缓冲区）并构造 QImage；copy() 让 QImage
+    拥有自己的像素，跨线程传给界面后不依赖这里复用的缓冲区，界面线程只需把它画出来。
+    view_size 为目标控件的物理像素尺寸，由主线程在控件尺寸变化时更新；为 None 时不缩放。
+    """
+
+    def __init__(self, view_size=None):
+        self.view_size = view_size
+        self._key = None
+        self._size = None
+        self._buf = None
+
+    def __call__(self, frame):
+        view_size = self.view_size
+        key = (frame.shape, view_size)
+        if key != self._key:
+            h, w = frame.shape[:2]
+            self._size = fit_size(w, h, *view_size) if view_size else (w, h)
+            self._buf = None if self._size == (w, h) else np.empty((self._size[1], self._size[0], 3), np.uint8)
+            self._key = key
+        if self._buf is not None:
+            frame = cv2.resize(frame, self._size, dst=self._buf, interpolation=cv2.INTER_LINEAR)
+        else:
+            frame = np.ascontiguousarray(frame)
+        h, w = frame.shape[:2]
+        if HAS_BGR888:
+            return QImage(frame.data, w, h, frame.strides[0], QImage.Format_BGR888).copy()
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        return QImage(rgb.data, w, h, rgb.strides[0], QImage.Format_RGB888).copy()
+
+
+class VideoView(QOpenGLWidget):
+    """
+    视频显示控件：帧通过 QPainter 画到 QOpenGLWidget 上，由 OpenGL 绘制引擎上传纹理，
+    等比缩放和双线性插值都在 GPU 上完成，不再每帧在 GUI 线程里做 CPU 的 SmoothTransformation。
+    接口与原先的 QLabel 用法保持一致：set_frame() 显示帧，setText()/clear() 显示提示文字。
+    """
+    BORDER_COLOR = QColor("#999")
+    resized = pyqtSignal(int, int)  # 控件尺寸变化时发射 (物理像素宽, 物理像素高)
+
+    def __init__(self, text=""):
+        super().__init__()
+        self._text = text
+        self._image = None
+        self._buf = None  # QImage 引用的像素缓冲区，需与 _image 同生命周期
+        # 不支持 Format_BGR888 时复用的 RGB 缓冲区及共享其内存的 QImage，只在分辨率变化时重新分配
+        self._rgb = None
+        self._rgb_image = None
+        # 显示尺寸缓存：源分辨率或控件尺寸变化时才重新计算；大于显示区域的帧先缩小到复用的缓冲区
+        self._fit_key = None
+        self._fit_size = None
+        self._fit_buf = None
+
+    def _fit(self, frame):
+        """
+        按控件的物理像素尺寸等比缩小帧（cv2.resize 写入复用缓冲区），纹理上传与 GPU 绘制只处理显示尺寸的像素。
+        帧本身不大于显示区域时原样返回。
+        """
+        key = (frame.shape, self.width(), self.height())
+        if key != self._fit_key:
+            h, w = frame.shape[:2]
+            self._fit_size = fit_size(w, h, *self.physical_size())
+            self._fit_buf = None if self._fit_size == (w, h) else \
+                np.empty((self._fit_size[1], self._fit_size[0], 3), np.uint8)
+            self._fit_key = key
+        if self._fit_buf is None:
+            return frame
+        return cv2.resize(frame, self._fit_size, dst=self._fit_buf, interpolation=cv2.INTER_LINEAR)
+
+    def set_frame(self, frame):
+        """
+        Qt 5.14+ 用 Format_BGR888 直接引用 numpy 缓冲区，省去整帧 cvtColor；
+        旧版 Qt 原地转换到复用的 RGB 缓冲区，不再每帧分配新数组和新 QImage
+        """
+        frame = self._fit(frame)
+        if HAS_BGR888:
+            self._buf = np.ascontiguousarray(frame)  # 已连续时不拷贝
+            h, w = self._buf.shape[:2]
+            self._image = QImage(self._buf.data, w, h, self._buf.strides[0], QImage.Format_BGR888)
+        else:
+            if self._rgb is None or self._rgb.shape != frame.shape:
+                h, w = frame.shape[:2]
+                self._rgb = np.empty((h, w, 3), np.uint8)
+                self._rgb_image = QImage(self._rgb.data, w, h, 3 * w, QImage.Format_RGB888)
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb)
+            self._buf, self._image = self._rgb, self._rgb_image
+        self.update()
+
+    def set_image(self, image):
+        """显示已在其他线程按显示尺寸准备好的 QImage（自带像素数据），GUI 线程不再做任何像素处理"""
+        self._image = image
+        self._buf = None
+        self.update()
+
+    def physical_size(self):
+        """控件的物理像素尺寸 (宽, 高)"""
+        dpr = self.devicePixelRatioF()
+        return int(self.width() * dpr), int(self.height() * dpr)
+
+    def resizeGL(self, w, h):
+        self.resized.emit(*self.physical_size())
+
+    def setText(self, text):
+        self._text = text
+        self._image = self._buf = None
+        self.update()
+
+    def clear(self):
+        self.setText("")
+
+    def paintGL(self):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), Qt.black)
+        if self._image is None:
+            painter.setPen(Qt.white)
+            painter.drawText(self.rect(), Qt.AlignCenter, self._text)
+        else:
+            painter.setRenderHint(QPainter.SmoothPixmapTransform)
+            size = self._image.size().scaled(self.size(), Qt.KeepAspectRatio)
+            x = (self.width() - size.width()) // 2
+            y = (self.height() - size.height()) // 2
+            painter.drawImage(QRect(x, y, size.width(), size.height()), self._image)
+        # 与原 QLabel 样式一致的虚线边框
+        painter.setPen(QPen(self.BORDER_COLOR, 2, Qt.DashLine))
+        painter.drawRect(self.rect().adjusted(1, 1, -1, -1))
+        painter.end()
+
+
+def open_video(path):
+    """
+    打开视频文件：优先用 FFmpeg 后端的硬件解码（NVDEC/VAAPI/DXVA2 等，第 0 块 GPU），
+    不支持或打开失败时回退到默认的软件解码。缓冲区限制为 2 帧，避免读到的帧滞后太多。
+    """
+    cap = None
+    if hasattr(cv2, 'CAP_PROP_HW_ACCELERATION'):
+        try:
+            cap = cv2.VideoCapture(path, cv2.CAP_FFMPEG, [
+                cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY,
+                cv2.CAP_PROP_HW_DEVICE, 0,
+            ])
+        except cv2.error:
+            cap = None
+    if cap is None or not cap.isOpened():
+        cap = cv2.VideoCapture(path)
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 2)
+    return cap
+
+
+def hw_accel_name(cap):
+    """返回实际使用的解码方式，用于状态栏提示（0 即 VIDEO_ACCELERATION_NONE，表示软件解码）"""
+    if not hasattr(cv2, 'CAP_PROP_HW_ACCELERATION'):
+        return "软件解码"
+    accel = int(cap.get(cv2.CAP_PROP_HW_ACCELERATION))
+    return "软件解码" if accel == 0 else f"硬件解码（{cap.getBackendName()}）"
+
+
+class FramePool:
+    """
+    送检帧的缓冲池：预分配 count 块固定尺寸的 BGR 缓冲区，主线程把帧缩放/拷贝进空闲块再放入最新帧槽，
+    检测线程渲染完归还，被槽挤掉或清空的帧也立即归还，稳定运行时不再逐帧分配整帧内存。
+    池暂时用尽时临时分配一块，归还时超出容量或尺寸不符的直接丢弃。
+    """
+
+    def __init__(self, shape, count):
+        self.shape = tuple(shape)
+        self._count = count
+        self._free = deque(np.empty(self.shape, np.uint8) for _ in range(count))
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            if self._free:
+                return self._free.popleft()
+        return np.empty(self.shape, np.uint8)
+
+    def release(self, buf):
+        if buf.shape != self.shape:
+            return
+        with self._lock:
+            if len(self._free) < self._count:
+                self._free.append(buf)
+
+
+class LatestFrames:
+    """
+    主线程与检测线程之间的"最新帧"槽：最多保留最近的 maxlen 帧，放入新帧时直接挤掉最旧的一帧，
+    检测线程落后时处理的总是最新的画面，而不是 FIFO 里积压的旧帧。
+    get() 一次取走全部待检测帧（可直接组成一个批次）；close() 后 get() 返回 None。
+    指定 pool 时，被挤掉、清空的帧归还给缓冲池；检测线程用完取走的帧后调用 release() 归还。
+    """
+
+    def __init__(self, maxlen=1, pool=None):
+        self._frames = deque(maxlen=maxlen)
+        self._cond = threading.Condition()
+        self._closed = False
+        self.pool = pool
+
+    def put(self, frame):
+        with self._cond:
+            if self.pool and len(self._frames) == self._frames.maxlen:
+                self.pool.release(self._frames[0])
+            self._frames.append(frame)
+            self._cond.notify()
+
+    def release(self, frames):
+        """归还检测线程已用完的帧"""
+        if self.pool:
+            for frame in frames:
+                self.pool.release(frame)
+
+    def get(self, timeout=None):
+        """取走所有待检测帧（按时间先后），超时返回空列表，关闭后返回 None"""
+        with self._cond:
+            if not self._frames and not self._closed:
+                self._cond.wait(timeout)
+            if self._closed:
+                return None
+            frames = list(self._frames)
+            self._frames.clear()
+            return frames
+
+    def clear(self):
+        with self._cond:
+            self.release(self._frames)
+            self._frames.clear()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self.release(self._frames)
+            self._frames.clear()
+            self._cond.notify_all()
+
+
+class CaptureThread(QThread):
+    """
+    采集线程：按视频帧率循环读取帧，按 stride 抽帧（跳过的帧只 grab() 不 retrieve()），只保留最新的一帧。
+    GUI 定时器通过 read_latest() 拉取，解码卡顿不再阻塞界面线程；跳帧请求由 seek() 记录，在下一次读取前执行。
+    每帧的显示图像（缩放到左侧控件尺寸的 QImage）也在本线程里用 display 构造好，界面线程只负责绘制。
+    """
+
+    def __init__(self, capture, fps, stride=1, start_pos=0):
+        super().__init__()
+        self.capture = capture
+        self.stride = stride
+        self.interval = stride / fps
+        self._pos = start_pos
+        self._lock = threading.Lock()
+        self._latest = None  # (frame, pos, 显示用 QImage)
+        self.display = DisplayImage()
+        self._seek_to = None
+        self._paused = threading.Event()
+        self._running = True
+
+    def read_latest(self):
+        """取走最新一帧，返回 (frame, pos, image)；自上次调用后没有新帧时返回 None"""
+        with self._lock:
+            latest, self._latest = self._latest, None
+        return latest
+
+    def seek(self, frame_no):
+        with self._lock:
+            self._seek_to = frame_no
+            self._latest = None
+
+    def pause(self):
+        self._paused.set()
+
+    def resume(self):
+        self._paused.clear()
+
+    def _read(self):
+        """跳过 stride - 1 帧后取出一帧，返回值与 read() 相同"""
+        for _ in range(self.stride - 1):
+            if not self.capture.grab():
+                return False, None
+            self._pos += 1
+        if not self.capture.grab():
+            return False, None
+        self._pos += 1
+        return self.capture.retrieve()
+
+    def run(self):
+        next_t = time.perf_counter()
+        while self._running:
+            with self._lock:
+                seek_to, self._seek_to = self._seek_to, None
+            if seek_to is not None:
+                self.capture.set(cv2.CAP_PROP_POS_FRAMES, seek_to)
+                self._pos = int(self.capture.get(cv2.CAP_PROP_POS_FRAMES))
+                next_t = time.perf_counter()
+
+            if self._paused.is_set():
+                time.sleep(0.01)
+                next_t = time.perf_counter()
+                continue
+
+            ret, frame = self._read()
+            if not ret:
+                break  # 播放结束，GUI 看到线程结束后停止定时器
+            image = self.display(frame)
+            with self._lock:
+                self._latest = (frame, self._pos, image)
+
+            # 按视频帧率限速；落后时以当前时间为新的基准，不追赶
+            next_t += self.interval
+            delay = next_t - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_t = time.perf_counter()
+
+    def stop(self):
+        self._running = False
+        self._paused.clear()
 
 
 # --------------------------------------------------------------------------
-# RealTimeDetectThread：从队列读取原始帧，用本地 yolo 模型做推理并发射渲染后的帧
+# RealTimeDetectThread：从最新帧槽读取原始帧，用本地 yolo 模型做推理并发射渲染后的帧
 # --------------------------------------------------------------------------
 class RealTimeDetectThread(QThread):
-    processed_frame = pyqtSignal(object)  # 发射处理后的 BGR ndarray
+    processed_frame = pyqtSignal(QImage)  # 发射处理后、已缩放到显示尺寸的 QImage（自带像素数据）
     error_occurred = pyqtSignal(str)  # 发射错误信息（字符串）
     detection_log = pyqtSignal(list)  # 发射检测结果日志 (list of dict)
 
-    def __init__(self, frame_queue: queue.Queue, device: str = 'gpu', preprocess_methods: list = None):
+    def __init__(self, frame_slot: LatestFrames, device: str = None, preprocess_methods: list = None,
+                 src_size=None):
         super().__init__()
-        self.frame_queue = frame_queue
-        self.device = device
+        self.frame_slot = frame_slot
+        self.src_size = src_size  # 原始视频的 (宽, 高)，送来的帧已缩小，日志中的坐标按它换算回原始分辨率
+        self.display = DisplayImage()  # 按右侧控件尺寸构造显示图像，view_size 由主线程在控件尺寸变化时更新
+        # 未指定设备时有 GPU 就用 cuda:0，否则回退到 CPU
+        self.device = device or ('cuda:0' if torch.cuda.is_available() else 'cpu')
         self.preprocess_methods = preprocess_methods or ['none']  # 存储预处理方法列表
         self._running = True
         self.last_frame = None  # 用于存储上一帧，用于降噪处理
-        self.last_processed_time = 0  # 用于帧率控制
-        self.min_interval = 1.0 / 15  # 最小处理间隔（15fps）
-        self.frame_buffer = []  # 用于存储处理后的帧
-        self.buffer_size = 2  # 缓冲区大小
-        self.alpha = 0.8  # 平滑过渡系数
-
-    def _smooth_transition(self, current_frame, previous_frame):
-        """平滑过渡处理"""
-        if previous_frame is None:
-            return current_frame
-        return cv2.addWeighted(current_frame, self.alpha, previous_frame, 1 - self.alpha, 0)
+        self._cuda_pre = None  # GPU 预处理器，模型在 CUDA 上且 OpenCV 支持 CUDA 时在 run() 中创建
+        self._clahe = cv2.createCLAHE(clipLimit=1.5, tileGridSize=(8, 8))  # CPU 上的 CLAHE 对象只创建一次
+        # CPU 预处理的中间结果缓冲区，按帧尺寸分配一次
+        self._pre_shape = None
+        self._pre_bufs = None
+        # 推理输入缓冲区：按帧尺寸分配一次，尺寸不变时每帧复用
+        self._src_shape = None
+        # 以下三项各有两份（双缓冲），相邻两批交替使用，上传下一批时不必等待上一批的前向结束
+        self._staging = None  # 缩放后的 BGR 帧 (BATCH_MAX, h, w, 3)（GPU 推理时为页锁定内存，上传可异步进行）
+        self._in = None  # 模型所在设备上的 (BATCH_MAX, 3, H, W) 输入张量，填充区固定为 114/255
+        self._roi = None  # _in 中有效图像区域的视图
+        self._copy_done = None  # 每个槽位最近一次上传完成的 CUDA 事件
+        self._slot = 0
+        self._copy_stream = None  # 专用于上传的 CUDA 流，与默认流上的推理并行
 
     def _fast_denoise(self, frame):
         """快速降噪处理（优化性能）"""
@@ -75,114 +813,165 @@ class RealTimeDetectThread(QThread):
 
     def _preprocess_frame(self, frame):
         """应用选定的预处理方法"""
+        # 送来的帧是缓冲池里的专用块，检测框可以直接画在上面，渲染完才归还，不必再拷贝
         if 'none' in self.preprocess_methods or not self.preprocess_methods:
-            return frame.copy()
-        
-        processed = frame.copy()
-        
-        # 检查是否需要跳过处理（帧率控制）
-        current_time = time.time()
-        if current_time - self.last_processed_time < self.min_interval:
-            # 如果缓冲区有帧，使用最新的帧
-            if self.frame_buffer:
-                return self.frame_buffer[-1]
-            return processed
+            return frame
         
-        # --- 优化：在较低分辨率下进行图像处理 ---
-        h_orig, w_orig = processed.shape[:2]
-        # 缩小图像到较低分辨率，例如四分之一尺寸
-        scale_factor = 0.5  # 0.5 表示缩小到一半，即面积缩小到四分之一
-        # 可以根据需要调整 scale_factor，例如 0.25 或更小
-        processed_small = cv2.resize(processed, (int(w_orig * scale_factor), int(h_orig * scale_factor)))
-
-        # 对缩小后的图像应用选中的预处理方法
-        for method in self.preprocess_methods:
-            try:
-                if method == 'clahe':
-                    # CLAHE (对比度受限的自适应直方图均衡化) - 增强局部对比度
-                    lab = cv2.cvtColor(processed_small, cv2.COLOR_BGR2LAB)
-                    l, a, b = cv2.split(lab)
-                    clahe = cv2.createCLAHE(clipLimit=1.5, tileGridSize=(8, 8))
-                    cl = clahe.apply(l)
-                    processed_small = cv2.merge((cl, a, b))
-                    processed_small = cv2.cvtColor(processed_small, cv2.COLOR_LAB2BGR)
+        # 送检帧率已由主线程按检测帧率抽样控制，这里每帧都按选定方法处理，不再复用上一帧的结果
+        processed = frame
+
+        # 送来的帧已由主线程缩小到网络输入尺寸（最长边 DETECT_SIZE），直接在这个分辨率上预处理，
+        # 不再先缩小一半再放大回来：省掉两次整帧 resize，也不损失细节
+        if self._cuda_pre is not None:
+            # 各预处理步骤都在 GPU 上完成，整帧只上传、下载各一次
+            processed = self._cuda_pre.process(processed, self.preprocess_methods, self.error_occurred.emit)
+        else:
+            # CPU 上每个方法都把结果写回 frame 本身（它是缓冲池里的专用块），中间结果写入按尺寸复用的缓冲区，
+            # 逐帧不再分配整帧数组。只有预处理线程调用这里，缓冲区无需加锁
+            if frame.shape != self._pre_shape:
+                h, w = frame.shape[:2]
+                self._pre_bufs = {
+                    'cvt': np.empty((h, w, 3), np.uint8),  # LAB / YCrCb 色彩空间
+                    'plane': np.empty((h, w), np.uint8),  # 亮度通道
+                    'plane_out': np.empty((h, w), np.uint8),  # 均衡化后的亮度通道
+                    'tmp': np.empty((h, w, 3), np.uint8),  # 不能原地执行的滤波的输出
+                }
+                self._pre_shape = frame.shape
+            bufs = self._pre_bufs
+
+            # 对输入尺寸的图像应用选中的预处理方法
+            for method in self.preprocess_methods:
+                try:
+                    if method == 'clahe':
+                        # CLAHE (对比度受限的自适应直方图均衡化) - 增强局部对比度
+                        lab = cv2.cvtColor(frame, cv2.COLOR_BGR2LAB, dst=bufs['cvt'])
+                        l = cv2.extractChannel(lab, 0, dst=bufs['plane'])
+                        if njit is not None:
+                            cl = clahe_numba(l, 1.5, (8, 8))
+                        else:
+                            cl = self._clahe.apply(l, dst=bufs['plane_out'])
+                        cv2.insertChannel(cl, lab, 0)
+                        cv2.cvtColor(lab, cv2.COLOR_LAB2BGR, dst=frame)
                     
-                elif method == 'histeq':
-                    # 全局直方图均衡化 - 增强整体对比度
-                    ycrcb = cv2.cvtColor(processed_small, cv2.COLOR_BGR2YCrCb)
-                    y, cr, cb = cv2.split(ycrcb)
-                    y_eq = exposure.equalize_hist(y)
-                    y_eq = (y_eq * 255).astype(np.uint8)
-                    processed_small = cv2.merge((y_eq, cr, cb))
-                    processed_small = cv2.cvtColor(processed_small, cv2.COLOR_YCrCb2BGR)
+                    elif method == 'histeq':
+                        # 全局直方图均衡化 - 增强整体对比度
+                        ycrcb = cv2.cvtColor(frame, cv2.COLOR_BGR2YCrCb, dst=bufs['cvt'])
+                        y = cv2.extractChannel(ycrcb, 0, dst=bufs['plane'])
+                        y_eq = cv2.equalizeHist(y, dst=bufs['plane_out'])  # 直接在 uint8 亮度平面上做，不经过浮点
+                        cv2.insertChannel(y_eq, ycrcb, 0)
+                        cv2.cvtColor(ycrcb, cv2.COLOR_YCrCb2BGR, dst=frame)
                     
-                elif method == 'sharpen':
-                    # 锐化处理 - 增强边缘和细节
-                    kernel = np.array([[-1, -1, -1],
-                                       [-1,  9, -1],
-                                       [-1, -1, -1]])
-                    processed_small = cv2.filter2D(processed_small, -1, kernel)
+                    elif method == 'sharpen':
+                        # 锐化处理 - 增强边缘和细节
+                        cv2.filter2D(frame, -1, SHARPEN_KERNEL, dst=bufs['tmp'])
+                        np.copyto(frame, bufs['tmp'])
                     
-                elif method == 'denoise':
-                    # 快速降噪处理 - 减少图像噪点
-                    # 使用中值滤波，核大小可调
-                    processed_small = cv2.medianBlur(processed_small, 3)
+                    elif method == 'denoise':
+                        # 快速降噪处理 - 减少图像噪点
+                        # 使用中值滤波，核大小可调
+                        cv2.medianBlur(frame, 3, dst=bufs['tmp'])
+                        np.copyto(frame, bufs['tmp'])
                     
-                elif method == 'contrast':
-                    # 对比度亮度调整 - 整体调整亮度和对比度
-                    alpha = 1.1  # 对比度控制 (1.0-2.0)
-                    beta = 10    # 亮度控制 (0-50)
-                    processed_small = cv2.convertScaleAbs(processed_small, alpha=alpha, beta=beta)
+                    elif method == 'contrast':
+                        # 对比度亮度调整 - 整体调整亮度和对比度（逐像素运算，可原地进行）
+                        alpha = 1.1  # 对比度控制 (1.0-2.0)
+                        beta = 10    # 亮度控制 (0-50)
+                        cv2.convertScaleAbs(frame, dst=frame, alpha=alpha, beta=beta)
             
-            except Exception as e:
-                # 如果某个预处理方法失败，记录错误并继续处理
-                error_msg = f"预处理方法 {method} 执行失败: {str(e)}"
-                self.error_occurred.emit(error_msg)
-                continue
+                except Exception as e:
+                    # 如果某个预处理方法失败，记录错误并继续处理
+                    error_msg = f"预处理方法 {method} 执行失败: {str(e)}"
+                    self.error_occurred.emit(error_msg)
+                    continue
 
-        # 将处理后的缩小图像放大回原始尺寸
-        processed = cv2.resize(processed_small, (w_orig, h_orig))
+            processed = frame
 
-        # 更新帧缓冲区
-        self.frame_buffer.append(processed)
-        if len(self.frame_buffer) > self.buffer_size:
-            self.frame_buffer.pop(0)
-        
-        # 应用平滑过渡
-        if len(self.frame_buffer) > 1:
-            processed = self._smooth_transition(processed, self.frame_buffer[-2])
-        
-        # 更新最后处理时间
-        self.last_processed_time = current_time
         return processed
 
+    def _prepare_input(self, model, shape):
+        """按帧尺寸计算 letterbox 几何（与 AutoShape 的 size=640 一致）并分配输入缓冲区"""
+        from utils.general import make_divisible
+
+        # ONNX Runtime / TensorRT 后端没有 torch 参数，按后端记录的设备和精度分配输入
+        p = next(model.parameters(), None)
+        if p is None:
+            backend = model.model
+            p = torch.empty(0, dtype=torch.half if getattr(backend, 'fp16', False) else torch.float32,
+                            device=getattr(backend, 'device', 'cpu'))
+        h, w = shape[:2]
+        g = 640 / max(h, w)
+        inf_h, inf_w = (make_divisible(int(x * g), int(model.stride)) for x in (h, w))
+        r = min(inf_h / h, inf_w / w)
+        new_h, new_w = int(round(h * r)), int(round(w * r))
+        top = int(round((inf_h - new_h) / 2 - 0.1))
+        left = int(round((inf_w - new_w) / 2 - 0.1))
+
+        self._staging = [torch.empty((BATCH_MAX, new_h, new_w, 3), dtype=torch.uint8, pin_memory=p.is_cuda)
+                         for _ in range(2)]
+        self._in = [torch.full((BATCH_MAX, 3, inf_h, inf_w), 114 / 255, dtype=p.dtype, device=p.device)
+                    for _ in range(2)]
+        self._roi = [x[:, :, top:top + new_h, left:left + new_w] for x in self._in]
+        self._copy_done = [None, None]
+        self._slot = 0
+        self._copy_stream = torch.cuda.Stream(device=p.device) if p.is_cuda else None
+        self._src_shape = shape
+
+    def _to_tensor(self, model, frames):
+        """
+        把一批帧缩放到暂存缓冲区后一次性异步上传，在设备上完成 BGR→RGB、HWC→CHW、FP16 转换与归一化，
+        返回 ((len(frames), 3, H, W) 的输入张量视图, 上传完成事件)。同一视频的帧尺寸相同，整批共用一套 letterbox 几何。
+        GPU 上传与转换在独立的 CUDA 流里进行，推理前由调用方让推理所在的流等待返回的事件（CPU 上事件为 None）；
+        暂存区和输入张量按批交替使用两份，写入某个槽位前先等该槽位上一次的上传结束。
+        """
+        if frames[0].shape != self._src_shape:
+            self._prepare_input(model, frames[0].shape)
+        slot, self._slot = self._slot, self._slot ^ 1
+        if self._copy_done[slot] is not None:
+            self._copy_done[slot].synchronize()
+
+        n = len(frames)
+        staging = self._staging[slot].numpy()
+        h, w = staging.shape[1:3]
+        for i, frame in enumerate(frames):
+            if frame.shape[:2] == (h, w):
+                staging[i] = frame  # 主线程已缩小到输入尺寸，只需拷入暂存区
+            else:
+                cv2.resize(frame, (w, h), dst=staging[i])
+
+        x, roi = self._in[slot], self._roi[slot][:n]
+        if self._copy_stream is None:
+            roi.copy_(self._staging[slot][:n].permute(0, 3, 1, 2).flip(1))
+            roi.mul_(1 / 255)
+            return x[:n], None
+
+        with torch.cuda.stream(self._copy_stream):
+            src = self._staging[slot][:n].to(x.device, non_blocking=True)
+            roi.copy_(src.permute(0, 3, 1, 2).flip(1))
+            roi.mul_(1 / 255)
+            done = torch.cuda.Event()
+            done.record(self._copy_stream)
+        self._copy_done[slot] = done
+        return x[:n], done
+
+    def _prepare_batch(self, model, frames):
+        """预处理线程中执行：逐帧预处理并把整批异步上传，返回 (预处理后的帧列表, 输入张量, 上传完成事件)"""
+        batch = [self._preprocess_frame(f) for f in frames]
+        return (batch, *self._to_tensor(model, batch))
+
     def run(self):
         try:
-            # ------------------------------------------------------------------
-            # 1) 获取脚本所在目录（假设本脚本位于 yolov5_local 根目录）
-            repo_dir = Path(__file__).parent.resolve()
+            # 取进程内缓存的模型（首次打开视频时才真正加载）
+            model = _get_model(self.device)
 
-            # 2) 模型文件 best.pt 也在同一目录
-            model_path = repo_dir / "best_1.pt"
-            if not model_path.exists():
-                raise FileNotFoundError(f"找不到模型文件：{model_path}")
-
-            # 3) 调用 torch.hub.load 加载本地仓库（由 repo_dir 提供）
-            #    source='local' 保证直接读取本地 hubconf.py
-            model = torch.hub.load(
-                str(repo_dir),
-                'custom',
-                path=str(model_path),
-                source='local'
-            )
-            model.to(self.device)
+            # hubconf 加载后 yolov5 的 utils 已在 sys.path 中
+            from utils.general import scale_boxes
+            from utils.plots import colors
 
-            # 优化模型参数，特别是NMS相关的阈值
-            model.conf = 0.25  # 降低置信度阈值，提高召回率
-            model.iou = 0.45   # 降低IOU阈值，减少重复检测
-            model.max_det = 100  # 限制最大检测数量
-            model.agnostic = True  # 类别无关的NMS
-            model.multi_label = True  # 允许多标签检测
+            if HAS_CV2_CUDA and self.device.startswith('cuda'):
+                self._cuda_pre = CudaPreprocessor()
+            elif njit is not None:
+                # 在检测线程里先用小图触发一次 JIT 编译（cache=True 时之后直接读磁盘缓存），第一帧不必等编译
+                clahe_numba(np.zeros((16, 16), np.uint8))
 
         except Exception as e:
             # 加载模型失败时，把异常堆栈发给主线程
@@ -191,50 +980,76 @@ class RealTimeDetectThread(QThread):
             return
 
         # ------------------------------------------------------------------
-        # 4) 模型加载成功后，循环从队列读取帧，做推理并渲染，然后发给主线程
+        # 4) 模型加载成功后，循环从最新帧槽读取帧，做推理并渲染，然后发给主线程。
+        #    预处理和上传交给单独的预处理线程：本批在 GPU 上前向时，下一批已在 CPU 上预处理并异步上传，
+        #    每批耗时接近 max(预处理, 推理) 而不是两者之和；同一时刻最多只有一批在预处理，内存占用有界
         # ------------------------------------------------------------------
+        prep_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="preprocess")
+        pending = None  # 已交给预处理线程的下一批：(帧列表, Future)
         while self._running:
-            try:
-                frame = self.frame_queue.get(timeout=0.1)
-            except queue.Empty:
-                continue
-
-            if frame is None:
-                # 收到 None 表示主线程准备停止
-                break
+            if pending is None:
+                # 一次取走槽中积攒的全部帧（最多 BATCH_MAX 帧，都是最新的），合成一个批次
+                frames = self.frame_slot.get(timeout=0.1)
+                if frames is None:
+                    # 槽已关闭，表示主线程准备停止
+                    break
+                if not frames:
+                    continue
+                pending = (frames, prep_pool.submit(self._prepare_batch, model, frames))
+            frames, future = pending
+            pending = None
 
             try:
-                # 添加预处理步骤
-                preprocessed = self._preprocess_frame(frame)
-                
-                # 推理时指定 size=640，让模型先把图像缩放到 640x640 再做 NMS，速度更快
-                results = model(preprocessed, size=640)
-
-                # 提取并格式化检测结果
-                detections = []
-                # results.pandas().xyxy[0] 可以获取包含框、置信度、类别等信息的DataFrame
-                # 但直接操作 torch tensor 更灵活，且避免 pandas 依赖
-                pred = results.pred[0]  # 获取原始预测结果 (tensor)
-
-                # 遍历每个检测结果
-                for *box, conf, cls in pred:
-                    label = model.names[int(cls)]
-                    x1, y1, x2, y2 = [int(x) for x in box]
-                    detections.append({
-                        "label": label,
-                        "confidence": float(conf),
-                        "box": [x1, y1, x2, y2]
-                    })
-
-                # 发射检测日志
-                self.detection_log.emit(detections)
-
-                # 渲染结果
-                processed = results.render()[0]  # BGR ndarray，已在原始比例上渲染好检测框
-                processed = processed.copy()  # 确保图像可写
-
-                # 发射渲染后的帧
-                self.processed_frame.emit(processed)
+                # 预处理好的张量直接交给模型（最长边 640），不再经过 AutoShape 每帧的拷贝、堆叠和 /255
+                batch, x, uploaded = future.result()
+                if uploaded is not None:
+                    torch.cuda.current_stream(x.device).wait_event(uploaded)
+                with torch.inference_mode():
+                    # 直接调用 AutoShape 内部的 DetectMultiBackend：输入已在模型设备上、精度一致，
+                    # 省去 AutoShape 每次调用的计时器、参数查询、.to()/type_as() 和 autocast 上下文
+                    pred = model.model(x)
+
+                    # 前向已提交到 GPU，趁它执行时把槽里已到的新帧交给预处理线程（不等待，没有新帧就跳过）
+                    upcoming = self.frame_slot.get(timeout=0)
+                    if upcoming:
+                        pending = (upcoming, prep_pool.submit(self._prepare_batch, model, upcoming))
+
+                    dets = batched_nms(pred, model.conf, model.iou, agnostic=model.agnostic,
+                                       multi_label=model.multi_label, max_det=model.max_det)
+                    for det in dets:
+                        scale_boxes(x.shape[2:], det[:, :4], batch[0].shape)
+
+                # 日志坐标换算回原始视频分辨率
+                box_scale = self.src_size[0] / batch[0].shape[1] if self.src_size else 1.0
+
+                # 整批检测结果一次拷回 CPU（只有一次设备到主机的同步），再按每帧的检测数切分
+                counts = np.cumsum([len(det) for det in dets])[:-1]
+                dets = np.split(torch.cat(dets).float().cpu().numpy(), counts)
+
+                # 按原顺序逐帧发射检测日志和渲染结果
+                for preprocessed, det in zip(batch, dets):
+                    boxes = det[:, :4].astype(np.int32)
+                    log_boxes = (det[:, :4] * box_scale).astype(np.int32)
+                    confs = det[:, 4].tolist()
+                    classes = det[:, 5].astype(np.int32).tolist()
+
+                    # 提取并格式化检测结果
+                    detections = [{"label": model.names[c], "confidence": conf, "box": box}
+                                  for box, conf, c in zip(log_boxes.tolist(), confs, classes)]
+
+                    # 发射检测日志
+                    self.detection_log.emit(detections)
+
+                    # 直接用 cv2 在预处理后的 BGR 帧上画框和标签（该帧为检测线程独占，可原地绘制），
+                    # 不经过 PIL，也不另外分配整帧图像
+                    for (x1, y1, x2, y2), conf, c in zip(boxes.tolist()[::-1], confs[::-1], classes[::-1]):
+                        color = colors(c, True)
+                        cv2.rectangle(preprocessed, (x1, y1), (x2, y2), color, 2)
+                        cv2.putText(preprocessed, f"{model.names[c]} {conf:.2f}", (x1, max(0, y1 - 5)),
+                                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1, cv2.LINE_AA)
+
+                    # 发射渲染后的帧
+                    self.processed_frame.emit(self.display(preprocessed))
 
             except Exception as e:
                 # 推理过程出错，将错误信息发给主线程（但线程继续尝试后续帧）
@@ -243,17 +1058,20 @@ class RealTimeDetectThread(QThread):
                 self.error_occurred.emit(err_msg)
                 continue
 
-        # 线程退出前，清空并丢弃队列中剩余的帧
-        while not self.frame_queue.empty():
-            _ = self.frame_queue.get()
+            finally:
+                # 本批帧已渲染并转成 QImage（或已出错），归还给缓冲池
+                self.frame_slot.release(frames)
+
+        # 线程退出前，等预处理线程结束并归还在途批次的帧，再丢弃槽中剩余的帧
+        prep_pool.shutdown(wait=True)
+        if pending is not None:
+            self.frame_slot.release(pending[0])
+        self.frame_slot.clear()
 
     def stop(self):
         self._running = False
-        # 放入 None 以解除 get() 阻塞
-        try:
-            self.frame_queue.put_nowait(None)
-        except:
-            pass
+        # 关闭槽以解除 get() 阻塞
+        self.frame_slot.close()
 
 
 # --------------------------------------------------------------------------
@@ -266,14 +1084,29 @@ class TrafficSignUI(QMainWindow):
         self.resize(1600, 900)
 
         self.orig_cam = None  # 用来读取原始视频
+        self.capture_thread = None  # 后台读取原始视频帧的采集线程
+        self._last_frame = None  # 左侧当前显示的原始帧，截屏时保存它
         self.timer = QTimer()
         self.timer.timeout.connect(self._update_frame)
+        # 检测日志合并刷新：收到结果后启动单次定时器，到时只显示最新一份
+        self._pending_detections = None
+        self._log_timer = QTimer()
+        self._log_timer.setSingleShot(True)
+        self._log_timer.timeout.connect(self._flush_detection_log)
 
-        self.frame_queue = None  # 用来传帧给检测线程
+        self.frame_slot = None  # 用来传帧给检测线程（只保留最新的几帧）
         self.detect_thread = None
         self.fps = 30
+        self.frame_stride = 1  # 每次显示前进的源视频帧数
+        # 播放位置由本地计数维护，只在跳转时查询 CAP_PROP_POS_FRAMES；总时长字符串只在打开时格式化一次
+        self._pos = 0
+        self._total_time_str = "00:00:00"
+        self.detect_size = None  # 送去检测的帧的 (宽, 高)，打开视频时按 DETECT_SIZE 计算；None 表示不缩放
         self.total_frames = 0
         self.preprocess_methods = ['none']  # 默认无预处理
+        # 检测抽样：距上次送帧超过 _infer_period 秒才把当前帧送去检测
+        self._infer_period = 1.0 / INFER_FPS
+        self._next_infer_ts = 0.0
 
         # 用于"等第一帧处理完再播放"逻辑
         self.waiting_start = False
@@ -303,18 +1136,16 @@ class TrafficSignUI(QMainWindow):
         h_top.setSpacing(10)  # 增加水平间距
 
         # 原始视频 QLabel
-        self.orig_label = QLabel("等待开始")
-        self.orig_label.setAlignment(Qt.AlignCenter)
+        self.orig_label = VideoView("等待开始")
         self.orig_label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)  # 允许扩展
-        self.orig_label.setStyleSheet("border:2px dashed #999; background:#000; color:#fff;")
         self.orig_label.setMinimumSize(320, 240)  # 设置最小尺寸而不是固定尺寸
+        self.orig_label.resized.connect(self._on_orig_view_resized)
 
         # 检测后视频 QLabel
-        self.proc_label = QLabel("等待开始")
-        self.proc_label.setAlignment(Qt.AlignCenter)
+        self.proc_label = VideoView("等待开始")
         self.proc_label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)  # 允许扩展
-        self.proc_label.setStyleSheet("border:2px dashed #999; background:#000; color:#fff;")
-        self.proc_label.setMinimumSize(320, 240)  # 设置最小尺寸而不是固定尺寸
+        self.proc_label.setMinimumSize(320, 240)
+        self.proc_label.resized.connect(self._on_proc_view_resized)
 
         font = QFont()
         font.setPointSize(14)
@@ -380,6 +1211,19 @@ class TrafficSignUI(QMainWindow):
         preprocess_group.setLayout(preprocess_layout)
         btns.addWidget(preprocess_group)
 
+        # 检测帧率：只按该频率把帧送去检测，显示仍按视频帧率
+        infer_group = QGroupBox("检测帧率")
+        infer_layout = QVBoxLayout()
+        self.infer_fps_label = QLabel(f"{INFER_FPS} 帧/秒")
+        self.infer_fps_slider = QSlider(Qt.Horizontal)
+        self.infer_fps_slider.setRange(1, 30)
+        self.infer_fps_slider.setValue(INFER_FPS)
+        self.infer_fps_slider.valueChanged.connect(self._set_infer_fps)
+        infer_layout.addWidget(self.infer_fps_label)
+        infer_layout.addWidget(self.infer_fps_slider)
+        infer_group.setLayout(infer_layout)
+        btns.addWidget(infer_group)
+
         v_layout.addLayout(btns)
 
         splitter.addWidget(left_widget)
@@ -438,6 +1282,12 @@ class TrafficSignUI(QMainWindow):
         self.act_overlay.triggered.connect(self._toggle_overlay)
         view_menu.addAction(self.act_overlay)
 
+    def _set_infer_fps(self, value):
+        """调整送去检测的帧率"""
+        self._infer_period = 1.0 / value
+        self._next_infer_ts = 0.0
+        self.infer_fps_label.setText(f"{value} 帧/秒")
+
     def _update_preprocess_methods(self):
         """更新预处理方法列表"""
         selected_methods = []
@@ -469,9 +1319,10 @@ class TrafficSignUI(QMainWindow):
         if not path:
             return
 
-        # 如果已有摄像头或线程在运行，先释放
+        # 如果已有摄像头或线程在运行，先释放（先停采集线程，再释放它正在读取的 VideoCapture）
+        self.timer.stop()
+        self._stop_capture()
         if self.orig_cam:
-            self.timer.stop()
             self.orig_cam.release()
             self.orig_cam = None
         if self.detect_thread:
@@ -480,26 +1331,37 @@ class TrafficSignUI(QMainWindow):
             self.detect_thread = None
 
         # —— 打开原始视频 —— #
-        self.orig_cam = cv2.VideoCapture(path)
+        self.orig_cam = open_video(path)
         if not self.orig_cam.isOpened():
             self.statusBar().showMessage("无法打开视频文件")
             return
+        self.info_text.append(f"视频解码方式: {hw_accel_name(self.orig_cam)}")
 
         # 读取总帧数和 FPS
         self.total_frames = int(self.orig_cam.get(cv2.CAP_PROP_FRAME_COUNT))
         self.fps = self.orig_cam.get(cv2.CAP_PROP_FPS) or 30
+        self.frame_stride = max(1, round(self.fps / DISPLAY_FPS))
+        src_w = int(self.orig_cam.get(cv2.CAP_PROP_FRAME_WIDTH))
+        src_h = int(self.orig_cam.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        r = DETECT_SIZE / max(src_w, src_h, 1)
+        self.detect_size = (max(1, int(round(src_w * r))), max(1, int(round(src_h * r)))) if r < 1 else None
         self.slider.setMaximum(self.total_frames)
         self.slider.setEnabled(True)
         dur = QTime(0, 0, 0).addMSecs(int(self.total_frames / self.fps * 1000))
-        self.time_label.setText(f"00:00:00 / {dur.toString('hh:mm:ss')}")
+        self._total_time_str = dur.toString('hh:mm:ss')
+        self._pos = 0
+        self.time_label.setText(f"00:00:00 / {self._total_time_str}")
 
         # —— 启动检测线程 —— #
-        self.frame_queue = queue.Queue(maxsize=5)
+        # 槽里最多 BATCH_MAX 帧、检测线程手里一批最多 BATCH_MAX 帧，外加主线程正在写入的一帧
+        w, h = self.detect_size or (src_w, src_h)
+        self.frame_slot = LatestFrames(maxlen=BATCH_MAX, pool=FramePool((h, w, 3), 2 * BATCH_MAX + 1))
         self.detect_thread = RealTimeDetectThread(
-            self.frame_queue, 
-            device='cuda:0',
-            preprocess_methods=self.preprocess_methods  # 使用预处理方法列表
+            self.frame_slot,
+            preprocess_methods=self.preprocess_methods,  # 使用预处理方法列表
+            src_size=(src_w, src_h)
         )
+        self.detect_thread.display.view_size = self.proc_label.physical_size()
         self.detect_thread.processed_frame.connect(self._on_processed_frame)
         self.detect_thread.error_occurred.connect(self._on_detect_error)
         self.detect_thread.detection_log.connect(self._on_detection_log)
@@ -510,98 +1372,110 @@ class TrafficSignUI(QMainWindow):
         if not ret:
             self.statusBar().showMessage("无法读取第一帧")
             return
+        self._pos = 1
 
         # 缓存第一帧，等待处理完再播放
-        self.first_frame = frame0.copy()
+        self.first_frame = frame0  # read() 返回新数组，检测线程在自己的副本上绘制，无需再拷贝
+        self._last_frame = self.first_frame
         self.waiting_start = True
 
-        # 把第一帧放入队列，让检测线程开始工作
-        try:
-            self.frame_queue.put_nowait(frame0.copy())
-        except queue.Full:
-            pass
+        # 采集线程在第一帧检测完成后与定时器一起启动，从第 2 帧开始读取
+        self.capture_thread = CaptureThread(self.orig_cam, self.fps, self.frame_stride, start_pos=self._pos)
+        self.capture_thread.display.view_size = self.orig_label.physical_size()
+
+        # 把第一帧放入槽，让检测线程开始工作
+        self.frame_slot.put(self._detect_input(frame0))
 
         # 左、右都暂时显示"等待开始"
         self.orig_label.setText("等待检测完成")
         self.proc_label.setText("等待检测完成")
         self.statusBar().showMessage("正在等待第一帧检测完成...")
 
-    def _update_frame(self):
-        """定时器触发：读一帧原始视频，显示左侧，并把 BGR 帧放入队列给检测线程"""
-        if not self.orig_cam:
-            return
+    def _stop_capture(self):
+        """停止并等待采集线程退出"""
+        if self.capture_thread:
+            self.capture_thread.stop()
+            self.capture_thread.wait()
+            self.capture_thread = None
+
+    def _detect_input(self, frame):
+        """
+        把要送去检测的帧缩小到 detect_size（保持宽高比，检测线程的 letterbox 只需补边），
+        直接写进缓冲池的空闲块，交给检测线程的数据量从整幅原始帧降到网络输入大小；
+        检测结果也画在这块缓冲区上，右侧显示时本来就会缩放到标签尺寸。
+        """
+        buf = self.frame_slot.pool.acquire()
+        if self.detect_size is None:
+            if frame.shape != buf.shape:
+                return frame.copy()  # 实际帧尺寸与视频属性不符，退回临时拷贝
+            np.copyto(buf, frame)
+            return buf
+        return cv2.resize(frame, self.detect_size, dst=buf, interpolation=cv2.INTER_AREA)
 
-        ret, frame = self.orig_cam.read()
-        if not ret:
-            # 视频播放结束
-            self.timer.stop()
-            self.statusBar().showMessage("播放结束")
-            if self.detect_thread:
-                self.detect_thread.stop()
+    def _update_frame(self):
+        """定时器触发：取采集线程读到的最新一帧，显示左侧，并把 BGR 帧放入最新帧槽给检测线程"""
+        if not self.capture_thread:
             return
 
-        # —— 显示原始帧到左侧 QLabel —— #
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        h, w, _ = rgb.shape
-        img = QImage(rgb.data, w, h, 3 * w, QImage.Format_RGB888)
-        pix = QPixmap.fromImage(img)
-        self.orig_label.setPixmap(
-            pix.scaled(self.orig_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
-        )
-
-        # —— 将 BGR 帧放入队列（非阻塞），供检测线程处理 —— #
-        try:
-            self.frame_queue.put_nowait(frame.copy())
-        except queue.Full:
-            # 队列已满就丢弃本帧
-            pass
+        latest = self.capture_thread.read_latest()
+        if latest is None:
+            if self.capture_thread.isFinished():
+                # 视频播放结束
+                self.timer.stop()
+                self.statusBar().showMessage("播放结束")
+                if self.detect_thread:
+                    self.detect_thread.stop()
+            return  # 还没有新帧，本次不重绘
+        frame, self._pos, image = latest
+        self._last_frame = frame
+
+        # —— 显示原始帧到左侧：采集线程已缩放好 QImage，这里只触发重绘 —— #
+        self.orig_label.set_image(image)
+
+        # —— 按检测帧率抽样，把 BGR 帧放入最新帧槽，供检测线程处理 —— #
+        # 放入的是缓冲池里的专用块，左侧显示和保存用的原始帧不受检测线程绘制的影响；
+        # 检测线程落后时旧帧直接被新帧挤掉并归还缓冲池；未到抽样时间则不做任何工作
+        now = time.monotonic()
+        if now >= self._next_infer_ts:
+            self.frame_slot.put(self._detect_input(frame))
+            self._next_infer_ts = now + self._infer_period
 
         # —— 更新滑块和时间标签 —— #
-        pos = int(self.orig_cam.get(cv2.CAP_PROP_POS_FRAMES))
         self.slider.blockSignals(True)
-        self.slider.setValue(pos)
+        self.slider.setValue(self._pos)
         self.slider.blockSignals(False)
-        cur = QTime(0, 0, 0).addMSecs(int(pos / self.fps * 1000))
-        tot = QTime(0, 0, 0).addMSecs(int(self.total_frames / self.fps * 1000))
-        self.time_label.setText(f"{cur.toString('hh:mm:ss')} / {tot.toString('hh:mm:ss')}")
+        cur = QTime(0, 0, 0).addMSecs(int(self._pos / self.fps * 1000))
+        self.time_label.setText(f"{cur.toString('hh:mm:ss')} / {self._total_time_str}")
+
+    def _on_orig_view_resized(self, w, h):
+        """左侧显示控件尺寸变化时，通知采集线程按新尺寸准备显示图像"""
+        if self.capture_thread:
+            self.capture_thread.display.view_size = (w, h)
+
+    def _on_proc_view_resized(self, w, h):
+        """右侧显示控件尺寸变化时，通知检测线程按新尺寸准备显示图像"""
+        if self.detect_thread:
+            self.detect_thread.display.view_size = (w, h)
 
-    def _on_processed_frame(self, processed_bgr):
-        """收到检测线程处理后（BGR ndarray）的帧，显示到右侧 QLabel"""
-        # 如果还在等待第一帧（waiting_start），则先把 first_frame 显示到左侧、processed_bgr 显示到右侧，
+    def _on_processed_frame(self, processed_img):
+        """收到检测线程处理后（已缩放到显示尺寸的 QImage）的帧，显示到右侧"""
+        # 如果还在等待第一帧（waiting_start），则先把 first_frame 显示到左侧、processed_img 显示到右侧，
         # 再一起启动定时器，从第二帧开始正常播放。
         if self.waiting_start:
-            # 显示第一帧：左侧显示原始 first_frame，右侧显示 processed_bgr
-            rgb0 = cv2.cvtColor(self.first_frame, cv2.COLOR_BGR2RGB)
-            h0, w0, _ = rgb0.shape
-            img0 = QImage(rgb0.data, w0, h0, 3 * w0, QImage.Format_RGB888)
-            pix0 = QPixmap.fromImage(img0)
-            self.orig_label.setPixmap(
-                pix0.scaled(self.orig_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            )
-
-            rgb1 = cv2.cvtColor(processed_bgr, cv2.COLOR_BGR2RGB)
-            h1, w1, _ = rgb1.shape
-            img1 = QImage(rgb1.data, w1, h1, 3 * w1, QImage.Format_RGB888)
-            pix1 = QPixmap.fromImage(img1)
-            self.proc_label.setPixmap(
-                pix1.scaled(self.proc_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            )
+            # 显示第一帧：左侧显示原始 first_frame，右侧显示 processed_img
+            self.orig_label.set_frame(self.first_frame)
+            self.proc_label.set_image(processed_img)
 
             # 第一步显示完毕后，让定时器开始从"第 2 帧"播放
             self.waiting_start = False
             # 先更新状态栏并启动 timer
             self.statusBar().showMessage("实时播放开始...")
-            self.timer.start(int(1000 / self.fps))
+            self.capture_thread.start()
+            self.timer.start(int(1000 * self.frame_stride / self.fps))
             return
 
         # 如果不是第一帧，表示常规播放时仅需刷新右侧
-        rgb = cv2.cvtColor(processed_bgr, cv2.COLOR_BGR2RGB)
-        h, w, _ = rgb.shape
-        img = QImage(rgb.data, w, h, 3 * w, QImage.Format_RGB888)
-        pix = QPixmap.fromImage(img)
-        self.proc_label.setPixmap(
-            pix.scaled(self.proc_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
-        )
+        self.proc_label.set_image(processed_img)
 
     def _on_detect_error(self, errmsg):
         """检测线程发来的错误，弹窗提示并状态栏显示"""
@@ -609,10 +1483,18 @@ class TrafficSignUI(QMainWindow):
         self.statusBar().showMessage("检测线程出错，详见弹窗", 5000)
 
     def _on_detection_log(self, detections):
-        """接收检测线程发来的日志信息并显示"""
-        self.info_text.clear()  # 清空旧日志
+        """接收检测线程发来的日志信息：只记下最新一帧的结果，由定时器合并刷新，不再每帧重建文本框"""
+        self._pending_detections = detections
+        if not self._log_timer.isActive():
+            self._log_timer.start(LOG_REFRESH_MS)
+
+    def _flush_detection_log(self):
+        """把最近一帧的检测结果一次性写入文本框（拼成一个字符串，只做一次排版）"""
+        detections, self._pending_detections = self._pending_detections, None
+        if detections is None:
+            return
         if not detections:
-            self.info_text.append("无检测结果")
+            self.info_text.setPlainText("无检测结果")
             return
 
         # 汇总检测结果，按类别计数
@@ -625,44 +1507,47 @@ class TrafficSignUI(QMainWindow):
                 detection_summary[label] = 1
 
         # 显示汇总信息
-        self.info_text.append("检测结果汇总：")
-        for label, count in detection_summary.items():
-            self.info_text.append(f"- {label}: {count} 个")
+        lines = ["检测结果汇总："]
+        lines += [f"- {label}: {count} 个" for label, count in detection_summary.items()]
 
-        self.info_text.append("\n详细列表：")
+        lines += ["", "详细列表："]
         # 显示详细检测信息（标签、置信度、坐标）
         for det in detections:
-            label = det["label"]
-            conf = det["confidence"]
             box = det["box"]
-            self.info_text.append(
-                f"- 标签: {label}, 置信度: {conf:.2f}, 坐标: [{box[0]}, {box[1]}, {box[2]}, {box[3]}]")
+            lines.append(f"- 标签: {det['label']}, 置信度: {det['confidence']:.2f}, "
+                         f"坐标: [{box[0]}, {box[1]}, {box[2]}, {box[3]}]")
+        self.info_text.setPlainText("\n".join(lines))
 
     def _seek_frame(self, frame_no):
-        """拖动滑块跳帧：先清空旧队列，再跳转原始视频到指定帧"""
+        """拖动滑块跳帧：先清空待检测的旧帧，再跳转原始视频到指定帧"""
         if not self.orig_cam:
             return
-        if self.frame_queue:
-            with self.frame_queue.mutex:
-                self.frame_queue.queue.clear()
-        self.orig_cam.set(cv2.CAP_PROP_POS_FRAMES, frame_no)
+        if self.frame_slot:
+            self.frame_slot.clear()
+        # 跳转由采集线程在下一次读取前执行，GUI 线程不直接操作正在被读取的 VideoCapture
+        if self.capture_thread:
+            self.capture_thread.seek(frame_no)
+        self._pos = frame_no
 
     def _toggle_play(self):
         if not self.orig_cam:
             return
         if self.timer.isActive():
             self.timer.stop()
+            if self.capture_thread:
+                self.capture_thread.pause()
             self.statusBar().showMessage("已暂停")
         else:
-            self.timer.start(int(1000 / self.fps))
+            if self.capture_thread:
+                self.capture_thread.resume()
+            self.timer.start(int(1000 * self.frame_stride / self.fps))
             self.statusBar().showMessage("播放中...")
 
     def _save_frame(self):
-        if not self.orig_cam:
-            return
-        ret, frame = self.orig_cam.read()
-        if not ret:
+        # 保存左侧当前显示的原始帧，不在 GUI 线程里读取采集线程正在使用的 VideoCapture
+        if self._last_frame is None:
             return
+        frame = self._last_frame
         p, _ = QFileDialog.getSaveFileName(self, "保存当前帧（原始画面）", "", "PNG (*.png)")
         if p:
             cv2.imwrite(p, frame)
@@ -681,6 +1566,7 @@ class TrafficSignUI(QMainWindow):
         """窗口关闭时，确保停止定时器、释放摄像头、停止检测线程"""
         if self.timer.isActive():
             self.timer.stop()
+        self._stop_capture()
         if self.orig_cam:
             self.orig_cam.release()
         if self.detect_thread: